@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Queue-backed asynchronous logging handlers
+
+Records are put on a bounded queue by the logging thread and formatted
+and written in batches by a background listener thread.
+"""
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Iterable, List
+
+
+OVERFLOW_POLICIES = ("block", "drop-oldest", "sample")
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler able to write a batch of records at once
+    """
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        """
+        Formats records and writes them with a single write and flush
+
+        Args:
+            records: list of log records to emit
+        """
+        lines = []
+        for record in records:
+            if record.levelno < self.level or not self.filter(record):
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+
+        self.acquire()
+        try:
+            self.stream.write(''.join(lines))
+            self.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class BatchingQueueListener:
+    """
+    Background thread draining a log queue into handlers in batches
+    """
+
+    _sentinel = None
+
+    def __init__(self, log_queue: queue.Queue,
+                 handlers: Iterable[logging.Handler], batch_size: int = 256):
+        """
+        Constructor method for BatchingQueueListener class
+
+        Args:
+            log_queue: queue the records are read from
+            handlers: handlers the records are dispatched to
+            batch_size: maximum number of records handled at once
+        """
+        self.queue = log_queue
+        self.handlers = list(handlers)
+        self.batch_size = batch_size
+        self.stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the listener thread
+        """
+        self.stopping.clear()
+        self._thread = threading.Thread(target=self._monitor, daemon=True,
+                                        name="log-queue-listener")
+        self._thread.start()
+
+    def stop(self):
+        """
+        Handles every queued record, then stops the listener thread
+
+        Stopping is signalled by the stopping event; the sentinel only
+        wakes the listener up, so an overflow policy evicting it from a
+        full queue cannot leave stop waiting forever.
+        """
+        if self._thread is None:
+            return
+        self.stopping.set()
+        try:
+            self.queue.put_nowait(self._sentinel)
+        except queue.Full:
+            pass
+        self._thread.join()
+        self._thread = None
+        for handler in self.handlers:
+            handler.flush()
+
+    def handle(self, records: List[logging.LogRecord]):
+        """
+        Dispatches a batch of records to every handler
+        """
+        for handler in self.handlers:
+            if hasattr(handler, 'emit_batch'):
+                handler.emit_batch(records)
+                continue
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def _monitor(self):
+        """
+        Listener thread loop: blocks for one record, then takes whatever
+        else is already queued, up to batch_size records, until stopping
+        is set and the queue is empty
+        """
+        while not (self.stopping.is_set() and self.queue.empty()):
+            record = self.queue.get()
+            batch = []
+            while True:
+                if record is self._sentinel:
+                    self.queue.task_done()
+                else:
+                    batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self.handle(batch)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    Handler enqueuing records to a bounded queue consumed by a
+    BatchingQueueListener
+
+    When the queue is full, overflow decides what happens:
+        block: wait for room in the queue
+        drop-oldest: discard the oldest queued record
+        sample: keep one overflowing record out of sample_rate, in place
+            of the oldest queued record, and discard the others
+    """
+
+    def __init__(self, handlers: Iterable[logging.Handler],
+                 maxsize: int = 10000, overflow: str = "block",
+                 batch_size: int = 256, sample_rate: int = 10):
+        """
+        Constructor method for AsyncQueueHandler class, starts the listener
+
+        Args:
+            handlers: handlers doing the formatting and I/O
+            maxsize: maximum number of queued records
+            overflow: policy applied when the queue is full
+            batch_size: maximum number of records handled at once
+            sample_rate: one overflowing record kept out of sample_rate
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("overflow must be one of {}"
+                             .format(", ".join(OVERFLOW_POLICIES)))
+        super(AsyncQueueHandler, self).__init__(queue.Queue(maxsize))
+        self.overflow = overflow
+        self.sample_rate = max(1, sample_rate)
+        self.dropped = 0
+        self._overflowed = 0
+        self._overflow_lock = threading.Lock()
+        self.listener = BatchingQueueListener(self.queue, handlers,
+                                              batch_size)
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merges the message arguments, leaving formatting (and redaction)
+        to the listener thread
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """
+        Puts a record on the queue, applying the overflow policy; records
+        are dropped once the handler is closing
+        """
+        if self.listener.stopping.is_set():
+            with self._overflow_lock:
+                self.dropped += 1
+            return
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        with self._overflow_lock:
+            if self.overflow == "sample":
+                self._overflowed += 1
+                if self._overflowed % self.sample_rate:
+                    self.dropped += 1
+                    return
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(record)
+                    return
+                except queue.Full:
+                    continue
+
+    def flush(self):
+        """
+        Blocks until every queued record has been handled
+        """
+        if self.listener._thread is not None:
+            self.queue.join()
+
+    def close(self):
+        """
+        Drains the queue and stops the listener
+
+        logging.shutdown() calls it at exit, so queued records are
+        flushed when the process ends.
+        """
+        self.listener.stop()
+        super(AsyncQueueHandler, self).close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of filter_datum: per-field re.sub loop versus the
+compiled single-pass RedactionEngine, both through filter_datum and held
+directly as RedactingFormatter does
+
+Usage: ./bench_filter_datum.py [lines]
+"""
+import re
+import sys
+import time
+from typing import Callable, List
+
+from filtered_logger import (PII_FIELDS, RedactingFormatter, filter_datum,
+                             get_redaction_engine)
+
+
+FIELD_COUNTS = (5, 50, 500)
+
+
+def legacy_filter_datum(fields: List[str], redaction: str,
+                        message: str, separator: str) -> str:
+    """
+    Previous filter_datum implementation: one re.sub per field
+    """
+    for f in fields:
+        message = re.sub(f'{f}=.*?{separator}',
+                         f'{f}={redaction}{separator}', message)
+    return message
+
+
+def make_fields(count: int) -> List[str]:
+    """
+    Returns count field names, starting with PII_FIELDS
+    """
+    fields = list(PII_FIELDS)[:count]
+    fields += [f'field_{i}' for i in range(count - len(fields))]
+    return fields
+
+
+def make_line(fields: List[str], separator: str) -> str:
+    """
+    Returns a log line carrying every field plus some non-PII fields
+    """
+    pairs = [f'{f}=value_{i}' for i, f in enumerate(fields)]
+    pairs += ['ip=60ed:c396:2ff:244:bbd0:9208:26f2:93ea',
+              'last_login=2019-11-14 06:14:24',
+              'user_agent=Mozilla/5.0']
+    return separator.join(pairs) + separator
+
+
+def lines_per_sec(func: Callable, fields: List[str], line: str,
+                  lines: int) -> float:
+    """
+    Returns the number of lines redacted per second by func
+    """
+    redaction = RedactingFormatter.REDACTION
+    separator = RedactingFormatter.SEPARATOR
+    start = time.perf_counter()
+    for _ in range(lines):
+        func(fields, redaction, line, separator)
+    return lines / (time.perf_counter() - start)
+
+
+def main(lines: int = 2000):
+    """
+    Runs both implementations for every field count and prints lines/sec
+    """
+    separator = RedactingFormatter.SEPARATOR
+    print(f'{"fields":>6} {"legacy l/s":>12} {"filter_datum":>12} '
+          f'{"engine l/s":>12} {"speedup":>8}')
+    for count in FIELD_COUNTS:
+        fields = make_fields(count)
+        line = make_line(fields, separator)
+        expected = legacy_filter_datum(fields, 'xxx', line, separator)
+        assert filter_datum(fields, 'xxx', line, separator) == expected
+
+        engine = get_redaction_engine(tuple(fields),
+                                      RedactingFormatter.REDACTION, separator)
+
+        legacy = lines_per_sec(legacy_filter_datum, fields, line, lines)
+        datum = lines_per_sec(filter_datum, fields, line, lines)
+        held = lines_per_sec(lambda f, r, m, s: engine.redact(m),
+                             fields, line, lines)
+        print(f'{count:>6} {legacy:>12.0f} {datum:>12.0f} '
+              f'{held:>12.0f} {held / legacy:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
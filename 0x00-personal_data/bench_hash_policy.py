@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Calibration benchmark of the bcrypt cost factor: verification latency per
+cost on this machine and the cost chosen for each target latency
+
+Usage: ./bench_hash_policy.py [target_ms ...]
+"""
+import sys
+import time
+
+import bcrypt
+
+from hash_service import calibrate_rounds
+
+
+def verify_ms(rounds: int, repeat: int = 3) -> float:
+    """
+    Returns the best verification time, in milliseconds, at a cost factor
+    """
+    hashed = bcrypt.hashpw(b'benchmark', bcrypt.gensalt(rounds))
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bcrypt.checkpw(b'benchmark', hashed)
+        best = min(best, 1000 * (time.perf_counter() - start))
+    return best
+
+
+def main(targets: list, min_rounds: int = 10, max_rounds: int = 14):
+    """
+    Prints the latency of each cost factor and the calibrated costs
+    """
+    print(f'{"rounds":>6} {"verify ms":>10} {"logins/s/core":>14}')
+    for rounds in range(min_rounds, max_rounds + 1):
+        ms = verify_ms(rounds)
+        print(f'{rounds:>6} {ms:>10.1f} {1000 / ms:>14.1f}')
+
+    print()
+    for target in targets:
+        rounds = calibrate_rounds(target, min_rounds, 16)
+        print(f'target {target:.0f} ms -> rounds {rounds}')
+
+
+if __name__ == '__main__':
+    main([float(t) for t in sys.argv[1:]] or [50, 100, 250, 500])
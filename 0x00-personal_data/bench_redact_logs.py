@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark of log file redaction: line by line through filter_datum versus
+the memory-mapped bytes path, reporting MB/s and peak RSS
+
+Each path runs in its own process so that peak RSS is measured alone; the
+parent stays small since children inherit its peak RSS on Linux.
+
+Usage: ./bench_redact_logs.py [size_mb]
+"""
+import filecmp
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from filtered_logger import PII_FIELDS, RedactingFormatter, filter_datum
+from redact_logs import WRITE_BUFFER_SIZE, redact_file_mmap
+
+
+LINE = ("[HOLBERTON] user_data INFO 2019-11-19 18:24:25,105: "
+        "name=Marlene Wood; email=hwestiii@att.net; phone=(473) 401-4253; "
+        "ssn=261-72-6780; password=K5?BMNv; ip=60ed:c396:2ff:244:bbd0; "
+        "last_login=2019-11-14 06:14:24; user_agent=Mozilla/5.0;\n")
+
+
+def redact_lines(src: str, dst: str):
+    """
+    Redacts src into dst one line at a time with filter_datum
+    """
+    with open(src, 'r') as f, open(dst, 'w') as out:
+        for line in f:
+            out.write(filter_datum(PII_FIELDS, RedactingFormatter.REDACTION,
+                                   line, RedactingFormatter.SEPARATOR))
+
+
+def redact_mmap(src: str, dst: str):
+    """
+    Redacts src into dst through the memory-mapped bytes path
+    """
+    with open(dst, 'wb', buffering=WRITE_BUFFER_SIZE) as out:
+        redact_file_mmap(src, out)
+
+
+def run_child(mode: str, src: str, dst: str):
+    """
+    Runs one redaction path and prints its duration and peak RSS
+    """
+    start = time.perf_counter()
+    {'lines': redact_lines, 'mmap': redact_mmap}[mode](src, dst)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(elapsed, peak_kb)
+
+
+def main(size_mb: int = 200):
+    """
+    Generates a log file of size_mb MB and benchmarks both paths on it
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'in.log')
+        block = LINE * 10000
+        with open(src, 'w') as f:
+            for _ in range(size_mb * 1000000 // len(block)):
+                f.write(block)
+        size = os.path.getsize(src) / 1e6
+
+        results = {}
+        print(f'{"path":>6} {"MB/s":>8} {"peak RSS MB":>12}')
+        for mode in ('lines', 'mmap'):
+            dst = os.path.join(tmp, f'{mode}.log')
+            output = subprocess.check_output(
+                [sys.executable, __file__, '--child', mode, src, dst])
+            elapsed, peak_kb = output.split()
+            results[mode] = dst
+            print(f'{mode:>6} {size / float(elapsed):>8.1f} '
+                  f'{int(peak_kb) / 1024:>12.1f}')
+
+        assert filecmp.cmp(results['lines'], results['mmap'], False), \
+            "outputs differ"
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] == '--child':
+        run_child(*sys.argv[2:])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark of verify_many: verifications/sec for each number of worker
+processes, up to the CPU count
+
+Usage: ./bench_verify_many.py [pairs] [rounds]
+"""
+from os import cpu_count
+import sys
+import time
+
+import bcrypt
+
+from encrypt_password import verify_many
+
+
+def main(count: int = 64, rounds: int = 10):
+    """
+    Hashes count passwords at the given cost, then verifies them all with
+    1, 2, 4, ... workers
+    """
+    pairs = []
+    for i in range(count):
+        password = f'password-{i}'
+        hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds))
+        pairs.append((hashed, password if i % 2 else 'wrong'))
+
+    cores = cpu_count() or 1
+    workers = 1
+    print(f'{"workers":>7} {"verif/s":>9} {"verif/s/core":>13}')
+    while True:
+        start = time.perf_counter()
+        results = dict(verify_many(pairs, workers))
+        elapsed = time.perf_counter() - start
+        assert all(results[i] == bool(i % 2) for i in range(count))
+        rate = count / elapsed
+        print(f'{workers:>7} {rate:>9.1f} {rate / workers:>13.1f}')
+        if workers >= cores:
+            break
+        workers = min(2 * workers, cores)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
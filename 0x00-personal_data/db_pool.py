@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Generic pool of reusable database connections
+
+Works with any DB-API connection factory (MySQL, SQLite, ...).
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+import queue
+import threading
+import time
+
+
+def is_alive(connection: Any) -> bool:
+    """
+    Checks whether a connection can still be used
+
+    Uses is_connected() when the driver provides it (MySQL), otherwise
+    runs a trivial query.
+    """
+    try:
+        if hasattr(connection, "is_connected"):
+            return connection.is_connected()
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+def reset(connection: Any) -> bool:
+    """
+    Ends the transaction of a connection given back to the pool, so the
+    next borrower neither inherits uncommitted writes nor a stale
+    snapshot
+
+    Uses reset_session() when the driver provides it (MySQL: it also
+    rolls back), otherwise rollback(). Returns whether it succeeded.
+    """
+    try:
+        if hasattr(connection, "reset_session"):
+            connection.reset_session()
+        else:
+            connection.rollback()
+        return True
+    except Exception:
+        return False
+
+
+class PooledConnection:
+    """
+    Connection borrowed from a ConnectionPool
+
+    Behaves like the underlying connection, except that close() gives it
+    back to the pool. Can be used as a context manager.
+    """
+
+    def __init__(self, pool: "ConnectionPool", connection: Any):
+        """
+        Constructor method for PooledConnection class
+
+        Args:
+            pool: pool the connection belongs to
+            connection: the underlying driver connection
+        """
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Delegates everything else to the underlying connection
+        """
+        if self._connection is None:
+            raise AttributeError("connection returned to the pool")
+        return getattr(self._connection, name)
+
+    def close(self):
+        """
+        Returns the connection to the pool
+        """
+        if self._connection is not None:
+            self._pool.release(self._connection)
+            self._connection = None
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of warm connections
+
+    Connections are created lazily up to size, reused most recently used
+    first, and health-checked before being handed out when they have been
+    idle for longer than check_after seconds.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 5,
+                 timeout: float = 30, check_after: float = 30):
+        """
+        Constructor method for ConnectionPool class
+
+        Args:
+            factory: callable returning a new connection
+            size: maximum number of connections
+            timeout: seconds to wait for a free connection
+            check_after: idle seconds after which a connection is
+                health-checked before reuse
+        """
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.check_after = check_after
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> PooledConnection:
+        """
+        Borrows a connection from the pool
+
+        Raises:
+            TimeoutError: if no connection is free within timeout seconds
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("no free connection in the pool")
+        try:
+            while True:
+                try:
+                    connection, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    return PooledConnection(self, self.factory())
+                if time.monotonic() - idle_since < self.check_after or \
+                        is_alive(connection):
+                    return PooledConnection(self, connection)
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: Any):
+        """
+        Gives a connection back to the pool, once reset; a connection
+        which cannot be reset is discarded
+        """
+        try:
+            if reset(connection):
+                self._idle.put((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """
+        Context manager borrowing a connection for the duration of a block
+        """
+        pooled = self.acquire()
+        try:
+            yield pooled
+        finally:
+            pooled.close()
+
+    def close(self):
+        """
+        Closes every idle connection
+        """
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(connection)
+
+    def _discard(self, connection: Any):
+        """
+        Closes a connection that is dropped from the pool
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -2,12 +2,16 @@
 """
 Password Encryption and Validation Module
 """
-import bcrypt
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from os import cpu_count
+from typing import Callable, Iterable, Iterator, List, Tuple
+import threading
+from hash_service import _checkpw, _hashpw, get_hash_policy, get_hash_service
 
 
 def hash_password(password: str) -> bytes:
     """
-        Generates a salted and hashed password.
+        Generates a salted and hashed password in the bcrypt worker pool.
 
         Args:
                 password (str): A string containing the plain text
@@ -16,10 +20,7 @@ def hash_password(password: str) -> bytes:
         Returns:
                 bytes: A byte string representing the salted, hashed password.
         """
-    encoded = password.encode()
-    hashed = bcrypt.hashpw(encoded, bcrypt.gensalt())
-
-    return hashed
+    return get_hash_service().hash(password)
 
 
 def is_valid(hashed_password: bytes, password: str) -> bool:
@@ -36,8 +37,109 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
                 bool: True if the provided password matches the hashed
                 password, False otherwise.
         """
-    valid = False
-    encoded = password.encode()
-    if bcrypt.checkpw(encoded, hashed_password):
-        valid = True
-    return valid
+    return get_hash_service().verify(hashed_password, password)
+
+
+def verify_and_rehash(hashed_password: bytes, password: str
+                      ) -> Tuple[bool, bytes]:
+    """
+        Validates a password and upgrades its hash to the current cost.
+
+        Args:
+                hashed_password (bytes): A byte string representing
+                the salted, hashed password.
+                password (str): A string containing the plain text
+                password to be validated.
+
+        Returns:
+                Tuple[bool, bytes]: Whether the password matches, and the
+                hash to store: a new one when the password matches a hash
+                of a stale cost factor, hashed_password otherwise.
+        """
+    valid, new_hash = get_hash_service().verify_and_rehash(hashed_password,
+                                                           password)
+    return valid, new_hash or hashed_password
+
+
+def _run_batch(func: Callable, jobs: List[tuple], workers: int,
+               progress: Callable[[int, int], None],
+               cancel: threading.Event) -> Iterator[Tuple[int, object]]:
+    """
+        Runs func on every job across a process pool.
+
+        At most four jobs per worker are submitted ahead, results are
+        yielded in completion order, and the remaining jobs are cancelled
+        when cancel is set or the generator is closed.
+        """
+    workers = workers or cpu_count() or 1
+    total = len(jobs)
+    done = 0
+    executor = ProcessPoolExecutor(workers)
+    try:
+        in_flight = {}
+        next_job = 0
+        while next_job < total or in_flight:
+            while next_job < total and len(in_flight) < 4 * workers:
+                future = executor.submit(func, *jobs[next_job])
+                in_flight[future] = next_job
+                next_job += 1
+            finished, _ = wait(in_flight, timeout=0.1,
+                               return_when=FIRST_COMPLETED)
+            if cancel is not None and cancel.is_set():
+                return
+            for future in finished:
+                index = in_flight.pop(future)
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+                yield index, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def hash_many(passwords: Iterable[str], workers: int = None,
+              progress: Callable[[int, int], None] = None,
+              cancel: threading.Event = None
+              ) -> Iterator[Tuple[int, bytes]]:
+    """
+        Hashes many passwords across all cores.
+
+        Args:
+                passwords (Iterable[str]): The plain text passwords.
+                workers (int): Number of worker processes, defaults to
+                the CPU count.
+                progress (Callable): Called with (done, total) after each
+                hash.
+                cancel (threading.Event): Stops the batch once set.
+
+        Returns:
+                Iterator[Tuple[int, bytes]]: (index, hash) pairs, yielded
+                as the hashes complete.
+        """
+    rounds = get_hash_policy().rounds
+    jobs = [(password.encode(), rounds) for password in passwords]
+    return _run_batch(_hashpw, jobs, workers, progress, cancel)
+
+
+def verify_many(pairs: Iterable[Tuple[bytes, str]], workers: int = None,
+                progress: Callable[[int, int], None] = None,
+                cancel: threading.Event = None
+                ) -> Iterator[Tuple[int, bool]]:
+    """
+        Validates many (hashed_password, password) pairs across all cores.
+
+        Args:
+                pairs (Iterable[Tuple[bytes, str]]): The hashed and plain
+                text passwords to check.
+                workers (int): Number of worker processes, defaults to
+                the CPU count.
+                progress (Callable): Called with (done, total) after each
+                check.
+                cancel (threading.Event): Stops the batch once set.
+
+        Returns:
+                Iterator[Tuple[int, bool]]: (index, valid) pairs, yielded
+                as the checks complete.
+        """
+    jobs = [(password.encode(), hashed) for hashed, password in pairs]
+    return _run_batch(_checkpw, jobs, workers, progress, cancel)
@@ -3,16 +3,127 @@
 Script for handling Personal Data
 """
 
-from typing import List
+from typing import List, Sequence, Tuple
+from functools import lru_cache
+import argparse
 import re
 import logging
+import sys
+import threading
+import time
 from os import environ
 import mysql.connector
+from async_handler import AsyncQueueHandler, BatchStreamHandler
+from db_pool import ConnectionPool
 
 
 # # PII fields to be redacted
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
 
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def _field_alternation(fields: Sequence[str]) -> str:
+    """
+    Returns a regex alternation matching any of fields
+
+    Fields are merged into a prefix tree so that, at each position of the
+    message, the regex engine only follows the branches that can match.
+    """
+    trie = {}
+    for f in fields:
+        node = trie
+        for char in f:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def _branch(node: dict) -> List[str]:
+        return [re.escape(char) + _group(child)
+                for char, child in sorted(node.items()) if char]
+
+    def _group(node: dict) -> str:
+        branches = _branch(node)
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:{})'.format('|'.join(branches))
+        return group + '?' if '' in node else group
+
+    alternation = '|'.join(_branch(trie))
+    return f'(?:{alternation})?' if '' in trie else alternation
+
+
+def _value_regex(separator: str, single_char: bool) -> str:
+    """
+    Returns the regex matching a field value up to the escaped separator
+    """
+    if single_char:
+        return f'=[^{separator}\\n]*'
+    return '=.*?'
+
+
+class RedactionEngine:
+    """
+    Compiled single-pass redactor for a fixed set of fields
+
+    All fields are folded into one alternation pattern so a message is
+    scanned once, whatever the number of fields to redact. The same
+    pattern is also compiled for UTF-8 encoded bytes (bytes_pattern, whose
+    matches are replaced by group 1 followed by bytes_redacted).
+    """
+
+    def __init__(self, fields: Sequence[str], redaction: str,
+                 separator: str):
+        """
+        Compiles the redaction pattern
+
+        Args:
+            fields: list of fields to redact
+            redaction: the value to use for redaction
+            separator: the separator to use between fields
+        """
+        self.fields = tuple(fields)
+        self.redaction = redaction
+        self.separator = separator
+        self.pattern = None
+        self.bytes_pattern = None
+        if not self.fields:
+            return
+
+        alternation = _field_alternation(self.fields)
+        sep = re.escape(separator)
+        self.pattern = re.compile(
+            '({}){}{}'.format(alternation,
+                              _value_regex(sep, len(separator) == 1), sep))
+        self.replacement = '\\g<1>={}{}'.format(
+            redaction.replace('\\', '\\\\'),
+            separator.replace('\\', '\\\\'))
+
+        single_byte = len(separator.encode()) == 1
+        self.bytes_pattern = re.compile(
+            '({}){}{}'.format(alternation, _value_regex(sep, single_byte),
+                              sep).encode())
+        self.bytes_redacted = f'={redaction}{separator}'.encode()
+
+    def redact(self, message: str) -> str:
+        """
+        Returns the message with every field value redacted
+        """
+        if self.pattern is None:
+            return message
+        return self.pattern.sub(self.replacement, message)
+
+
+@lru_cache(maxsize=128)
+def get_redaction_engine(fields: Tuple[str, ...], redaction: str,
+                         separator: str) -> RedactionEngine:
+    """
+    Returns the cached RedactionEngine for fields/redaction/separator
+    """
+    return RedactionEngine(fields, redaction, separator)
+
 
 def filter_datum(fields: List[str], redaction: str,
                  message: str, separator: str) -> str:
@@ -29,39 +140,68 @@ def filter_datum(fields: List[str], redaction: str,
     Returns:
         The filtered string message with redacted values
     """
-    for f in fields:
-        message = re.sub(f'{f}=.*?{separator}',
-                         f'{f}={redaction}{separator}', message)
-    return message
+    engine = get_redaction_engine(tuple(fields), redaction, separator)
+    return engine.redact(message)
 
 
-def get_logger() -> logging.Logger:
+def get_logger(async_mode: bool = None) -> logging.Logger:
     """
     Returns a Logger object for handling Personal Data
 
+    In asynchronous mode, records are only enqueued by the calling thread;
+    redaction, formatting and I/O happen in a background thread. The mode
+    and its queue are configured with the PERSONAL_DATA_LOG_ASYNC,
+    PERSONAL_DATA_LOG_QUEUE_SIZE and PERSONAL_DATA_LOG_OVERFLOW
+    (block, drop-oldest or sample) environment variables.
+
+    Args:
+        async_mode: enables the asynchronous mode, defaults to
+            PERSONAL_DATA_LOG_ASYNC
+
     Returns:
         A Logger object with INFO log level and RedactingFormatter
         formatter for filtering PII fields
     """
+    if async_mode is None:
+        async_mode = environ.get("PERSONAL_DATA_LOG_ASYNC", "") in (
+            "1", "true", "yes")
+
     logger = logging.getLogger("user_data")
     logger.setLevel(logging.INFO)
     logger.propagate = False
 
-    stream_handler = logging.StreamHandler()
+    stream_handler = BatchStreamHandler()
     stream_handler.setFormatter(RedactingFormatter(list(PII_FIELDS)))
-    logger.addHandler(stream_handler)
+    if not async_mode:
+        logger.addHandler(stream_handler)
+        return logger
+
+    queue_handler = AsyncQueueHandler(
+        [stream_handler],
+        maxsize=int(environ.get("PERSONAL_DATA_LOG_QUEUE_SIZE", 10000)),
+        overflow=environ.get("PERSONAL_DATA_LOG_OVERFLOW", "block"))
+    logger.addHandler(queue_handler)
 
     return logger
 
 
-def get_db() -> mysql.connector.connection.MySQLConnection:
+def get_db(pooled: bool = False
+           ) -> mysql.connector.connection.MySQLConnection:
     """
     Returns a MySQLConnection object for accessing Personal Data database
 
+    Args:
+        pooled: borrow the connection from the pool returned by
+            get_db_pool instead of opening a new one; closing it gives
+            it back to the pool
+
     Returns:
         A MySQLConnection object using connection details from
         environment variables
     """
+    if pooled:
+        return get_db_pool().acquire()
+
     username = environ.get("PERSONAL_DATA_DB_USERNAME", "root")
     password = environ.get("PERSONAL_DATA_DB_PASSWORD", "")
     host = environ.get("PERSONAL_DATA_DB_HOST", "localhost")
@@ -74,13 +214,132 @@ def get_db() -> mysql.connector.connection.MySQLConnection:
     return cnx
 
 
-def main():
+def get_db_pool() -> ConnectionPool:
+    """
+    Returns the shared pool of Personal Data database connections
+
+    The pool is created on first use with the PERSONAL_DATA_DB_* connection
+    details, PERSONAL_DATA_DB_POOL_SIZE connections (default 5) and a
+    PERSONAL_DATA_DB_POOL_TIMEOUT seconds wait for a free one (default 30).
+
+    Returns:
+        A ConnectionPool object whose connections are used as context
+        managers or given back with close()
+    """
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = ConnectionPool(
+                get_db,
+                size=int(environ.get("PERSONAL_DATA_DB_POOL_SIZE", 5)),
+                timeout=float(environ.get("PERSONAL_DATA_DB_POOL_TIMEOUT",
+                                          30)))
+    return _db_pool
+
+
+def build_users_query(columns: List[str] = None, where: str = None) -> str:
+    """
+    Returns the SELECT statement on the users table
+
+    Args:
+        columns: names of the columns to select, all of them by default
+        where: optional SQL condition filtering the rows
+
+    Returns:
+        The SQL query string
+    """
+    projection = "*"
+    if columns:
+        for column in columns:
+            if not re.fullmatch(r'\w+', column):
+                raise ValueError(f"Invalid column name: {column}")
+        projection = ", ".join(f"`{column}`" for column in columns)
+
+    query = f"SELECT {projection} FROM users"
+    if where:
+        query += f" WHERE {where}"
+    return query + ";"
+
+
+def stream_rows(db: mysql.connector.connection.MySQLConnection,
+                query: str, logger: logging.Logger,
+                batch_size: int = 1000) -> int:
+    """
+    Streams the rows of a query to the logger, one batch at a time
+
+    Rows are read from an unbuffered cursor with fetchmany, so the result
+    set is never held client-side, and each batch of log records is
+    handed to the logger handlers at once.
+
+    Args:
+        db: connection to the Personal Data database
+        query: the SQL query to run
+        logger: logger the rows are sent to
+        batch_size: number of rows fetched and logged at once
+
+    Returns:
+        The number of rows exported
+    """
+    cursor = db.cursor(buffered=False)
+    cursor.execute(query)
+    prefixes = [f'{i[0]}=' for i in cursor.description]
+    enabled = logger.isEnabledFor(logging.INFO)
+
+    count = 0
+    rows = cursor.fetchmany(batch_size)
+    while rows:
+        count += len(rows)
+        if enabled:
+            records = [logger.makeRecord(
+                logger.name, logging.INFO, __file__, 0,
+                '; '.join(p + str(r) for p, r in zip(prefixes, row)) + ';',
+                None, None) for row in rows]
+            for handler in logger.handlers:
+                if hasattr(handler, 'emit_batch'):
+                    handler.emit_batch(records)
+                else:
+                    for record in records:
+                        handler.handle(record)
+        rows = cursor.fetchmany(batch_size)
+
+    cursor.close()
+    return count
+
+
+def main(argv: List[str] = None):
     """
     Main function to retrieve user data from database and log to console
+
+    Args:
+        argv: command line arguments, defaults to sys.argv
     """
+    parser = argparse.ArgumentParser(description="Export redacted users")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream rows in batches and report rows/sec")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="rows fetched and logged at once (streaming)")
+    parser.add_argument("--columns",
+                        help="comma separated list of columns to export")
+    parser.add_argument("--where", help="SQL condition filtering the rows")
+    args = parser.parse_args(argv)
+
+    columns = args.columns.split(",") if args.columns else None
+    query = build_users_query(columns, args.where)
+
     db = get_db()
+    if args.stream:
+        logger = get_logger()
+        start = time.perf_counter()
+        count = stream_rows(db, query, logger, args.batch_size)
+        elapsed = time.perf_counter() - start
+        db.close()
+        print(f"{count} rows in {elapsed:.2f}s "
+              f"({count / elapsed if elapsed else 0:.0f} rows/sec)",
+              file=sys.stderr)
+        return
+
     cursor = db.cursor()
-    cursor.execute("SELECT * FROM users;")
+    cursor.execute(query)
     field_names = [i[0] for i in cursor.description]
 
     logger = get_logger()
@@ -111,15 +370,18 @@ class RedactingFormatter(logging.Formatter):
         """
         super(RedactingFormatter, self).__init__(self.FORMAT)
         self.fields = fields
+        self.engine = get_redaction_engine(tuple(fields), self.REDACTION,
+                                           self.SEPARATOR)
 
     def format(self, record: logging.LogRecord) -> str:
         """
         Formats the specified log record as text.
 
-        Filters values in incoming log records using filter_datum.
+        Filters values in incoming log records using the compiled
+        redaction engine.
         """
-        record.msg = filter_datum(self.fields, self.REDACTION,
-                                  record.getMessage(), self.SEPARATOR)
+        record.msg = self.engine.redact(record.getMessage())
+        record.args = None
         return super(RedactingFormatter, self).format(record)
 
 
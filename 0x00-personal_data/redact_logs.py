@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Script re-scrubbing existing log files of Personal Data
+
+Inputs are split into line-aligned chunks which are redacted across a
+process pool with the same fields and rules as RedactingFormatter.
+Output order is preserved.
+
+With --mmap, files are instead memory-mapped and scanned as bytes in the
+current process, keeping memory flat whatever the file size.
+
+Usage: ./redact_logs.py [-w WORKERS] [-c CHUNK_SIZE] [--mmap] [-o OUTPUT]
+                        [FILE ...]
+"""
+
+from collections import deque
+from multiprocessing import Pool
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+import argparse
+import mmap
+import os
+import sys
+import time
+from filtered_logger import (PII_FIELDS, RedactingFormatter,
+                             get_redaction_engine)
+
+
+_engine = None
+
+# Size of the buffered writes and of the mapped window kept resident
+WRITE_BUFFER_SIZE = 1 << 20
+MMAP_WINDOW_SIZE = 1 << 24
+
+
+def read_chunks(stream: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """
+    Reads a stream in chunks ending on a line boundary
+
+    Args:
+        stream: binary stream to read
+        chunk_size: approximate size of each chunk in bytes
+
+    Returns:
+        An iterator over the chunks
+    """
+    tail = b''
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            if tail:
+                yield tail
+            return
+        if tail:
+            data = tail + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            tail = data
+            continue
+        tail = data[cut:]
+        yield data[:cut]
+
+
+def _init_worker(fields: Tuple[str, ...], redaction: str, separator: str):
+    """
+    Compiles the redaction engine once in each worker process
+    """
+    global _engine
+    _engine = get_redaction_engine(fields, redaction, separator)
+
+
+def redact_chunk(chunk: bytes) -> Tuple[bytes, int, int, float]:
+    """
+    Redacts a chunk of log lines in a worker process
+
+    Args:
+        chunk: line-aligned chunk of log lines
+
+    Returns:
+        The redacted chunk, the worker pid, the input size in bytes and
+        the time spent redacting
+    """
+    start = time.perf_counter()
+    text = chunk.decode('utf-8', 'surrogateescape')
+    redacted = _engine.redact(text).encode('utf-8', 'surrogateescape')
+    return redacted, os.getpid(), len(chunk), time.perf_counter() - start
+
+
+def redact_streams(inputs: Iterable[BinaryIO], output: BinaryIO,
+                   workers: int = None, chunk_size: int = 1 << 22,
+                   fields: Tuple[str, ...] = PII_FIELDS
+                   ) -> Dict[int, List[float]]:
+    """
+    Redacts input streams into output across a process pool
+
+    At most two chunks per worker are in flight, so memory use does not
+    depend on the size of the inputs.
+
+    Args:
+        inputs: binary streams to redact, in order
+        output: binary stream receiving the redacted lines
+        workers: number of worker processes, defaults to the CPU count
+        chunk_size: approximate size of each chunk in bytes
+        fields: fields to redact
+
+    Returns:
+        Per worker pid, the number of chunks, bytes and seconds handled
+    """
+    workers = workers or os.cpu_count()
+    stats = {}
+    initargs = (tuple(fields), RedactingFormatter.REDACTION,
+                RedactingFormatter.SEPARATOR)
+
+    def _write(result):
+        redacted, pid, size, seconds = result
+        output.write(redacted)
+        worker = stats.setdefault(pid, [0, 0, 0.0])
+        worker[0] += 1
+        worker[1] += size
+        worker[2] += seconds
+
+    with Pool(workers, _init_worker, initargs) as pool:
+        pending = deque()
+        for stream in inputs:
+            for chunk in read_chunks(stream, chunk_size):
+                pending.append(pool.apply_async(redact_chunk, (chunk,)))
+                if len(pending) >= 2 * workers:
+                    _write(pending.popleft().get())
+        while pending:
+            _write(pending.popleft().get())
+    output.flush()
+
+    return stats
+
+
+def redact_file_mmap(path: str, output: BinaryIO,
+                     fields: Tuple[str, ...] = PII_FIELDS,
+                     window_size: int = 1 << 20) -> int:
+    """
+    Redacts a file by scanning its memory map as bytes
+
+    The bytes pattern of the redaction engine is searched in the map
+    itself, one line-aligned window at a time, and the text between its
+    matches is written from a memoryview of the map: neither a window nor
+    a line is ever copied, and pages already scanned are released every
+    MMAP_WINDOW_SIZE bytes.
+
+    Args:
+        path: path of the log file to redact
+        output: binary stream receiving the redacted lines, preferably
+            with a large buffer
+        fields: fields to redact
+        window_size: approximate size of each substituted window in bytes
+
+    Returns:
+        The number of bytes read
+    """
+    engine = get_redaction_engine(tuple(fields),
+                                  RedactingFormatter.REDACTION,
+                                  RedactingFormatter.SEPARATOR)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if engine.bytes_pattern is None:
+                output.write(mm)
+                return size
+            pattern = engine.bytes_pattern
+            redacted = engine.bytes_redacted
+            can_release = hasattr(mm, 'madvise')
+            if can_release:
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            start = released = 0
+            with memoryview(mm) as view:
+                while start < size:
+                    end = mm.find(b'\n', min(start + window_size, size) - 1)
+                    end = size if end == -1 else end + 1
+                    for match in pattern.finditer(mm, start, end):
+                        output.write(view[start:match.start()])
+                        output.write(match.group(1))
+                        output.write(redacted)
+                        start = match.end()
+                    output.write(view[start:end])
+                    start = end
+                    if can_release and start - released > MMAP_WINDOW_SIZE:
+                        end = start - start % mmap.PAGESIZE
+                        mm.madvise(mmap.MADV_DONTNEED, released,
+                                   end - released)
+                        released = end
+    return size
+
+
+def _open_inputs(paths: List[str]) -> Iterator[BinaryIO]:
+    """
+    Opens the input files one at a time, '-' or no path meaning stdin
+    """
+    for path in paths or ['-']:
+        if path == '-':
+            yield sys.stdin.buffer
+            continue
+        with open(path, 'rb') as f:
+            yield f
+
+
+def main(argv: List[str] = None):
+    """
+    Main function redacting log files and reporting throughput per worker
+
+    Args:
+        argv: command line arguments, defaults to sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Redact PII in log files")
+    parser.add_argument("files", nargs="*", help="log files, default stdin")
+    parser.add_argument("-o", "--output", help="output file, default stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes")
+    parser.add_argument("-c", "--chunk-size", type=int, default=1 << 22,
+                        help="approximate chunk size in bytes")
+    parser.add_argument("--mmap", action="store_true",
+                        help="memory-map the files and redact them as bytes")
+    args = parser.parse_args(argv)
+
+    if args.mmap:
+        if not args.files or '-' in args.files:
+            parser.error("--mmap needs file paths")
+        start = time.perf_counter()
+        if args.output:
+            output = open(args.output, 'wb', buffering=WRITE_BUFFER_SIZE)
+        else:
+            output = open(sys.stdout.fileno(), 'wb',
+                          buffering=WRITE_BUFFER_SIZE, closefd=False)
+        with output:
+            total = sum(redact_file_mmap(path, output) for path in args.files)
+        elapsed = time.perf_counter() - start
+        rate = total / elapsed / 1e6 if elapsed else 0
+        print(f"total: {total / 1e6:.1f} MB in {elapsed:.2f}s "
+              f"({rate:.1f} MB/s)", file=sys.stderr)
+        return
+
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, 'wb') as output:
+            stats = redact_streams(_open_inputs(args.files), output,
+                                   args.workers, args.chunk_size)
+    else:
+        stats = redact_streams(_open_inputs(args.files), sys.stdout.buffer,
+                               args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    total = 0
+    for pid, (chunks, size, seconds) in sorted(stats.items()):
+        total += size
+        rate = size / seconds / 1e6 if seconds else 0
+        print(f"worker {pid}: {chunks} chunks, {size / 1e6:.1f} MB "
+              f"in {seconds:.2f}s ({rate:.1f} MB/s)", file=sys.stderr)
+    rate = total / elapsed / 1e6 if elapsed else 0
+    print(f"total: {total / 1e6:.1f} MB in {elapsed:.2f}s ({rate:.1f} MB/s)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
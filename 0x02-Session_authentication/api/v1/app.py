@@ -4,6 +4,7 @@ Route module for the API
 """
 from os import getenv
 from api.v1.views import app_views
+from api.v1.auth.path_matcher import PathMatcher, load_excluded_paths
 from flask import Flask, jsonify, abort, request
 from flask_cors import (CORS, cross_origin)
 import os
@@ -32,22 +33,27 @@ elif AUTH_TYPE == 'session_db_auth':
     from api.v1.auth.session_db_auth import SessionDBAuth
     auth = SessionDBAuth()
 
+app.extensions['auth'] = auth
+
+# Paths served without authentication, compiled once
+excluded_paths = PathMatcher(load_excluded_paths())
+
 @app.before_request
 def before_request():
     """ Before each request, this function is called to check the current user
     """
     if auth is None:
         pass
+    elif not auth.require_auth(request.path, excluded_paths):
+        setattr(request, "current_user", None)
     else:
-        setattr(request, "current_user", auth.current_user(request))
-        excluded_list = ['/api/v1/status/', '/api/v1/unauthorized/', '/api/v1/forbidden/', '/api/v1/auth_session/login/']
-        
-        if auth.require_auth(request.path, excluded_list):
-            cookie = auth.session_cookie(request)
-            if auth.authorization_header(request) is None and cookie is None:
-                abort(401, description="Unauthorized")
-            if auth.current_user(request) is None:
-                abort(403, description='Forbidden')
+        context = auth.context(request)
+        if context.authorization_header is None and \
+                context.session_cookie is None:
+            abort(401, description="Unauthorized")
+        setattr(request, "current_user", context.user)
+        if context.user is None:
+            abort(403, description='Forbidden')
 
 @app.errorhandler(404)
 def not_found(error) -> str:
@@ -4,21 +4,71 @@ Module for authentication
 """
 
 
-from typing import List, TypeVar
+from functools import cached_property
+from typing import List, TypeVar, Union
 from flask import request
+from api.v1.auth.path_matcher import PathMatcher, compile_excluded_paths
 import os
 
 
+class AuthContext:
+    """Authentication state of one request: its Authorization header,
+    session cookie and user, each resolved at most once
+    """
+
+    def __init__(self, auth: 'Auth', request):
+        """Initializes the context of request, resolved by auth
+        """
+        self.auth = auth
+        self.request = request
+
+    @cached_property
+    def authorization_header(self) -> str:
+        """The Authorization header of the request
+        """
+        return self.auth.authorization_header(self.request)
+
+    @cached_property
+    def session_cookie(self) -> str:
+        """The session cookie of the request
+        """
+        return self.auth.session_cookie(self.request)
+
+    @cached_property
+    def user(self) -> TypeVar('User'):
+        """The user of the request, looked up from the header or cookie
+        above rather than read again from the request
+        """
+        return self.auth.user_from_context(self)
+
+
 class Auth:
     """_summary_
     """
 
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
+    def context(self, request) -> AuthContext:
+        """Returns the AuthContext of request, created once per request
+
+        Args:
+            request (_type_): the request
+
+        Returns:
+                        AuthContext: its authentication context
+        """
+        context = getattr(request, "auth_context", None)
+        if context is None:
+            context = AuthContext(self, request)
+            setattr(request, "auth_context", context)
+        return context
+
+    def require_auth(self, path: str,
+                     excluded_paths: Union[List[str], PathMatcher]) -> bool:
         """_summary_
 
         Args:
             path (str): _description_
-            excluded_paths (List[str]): _description_
+            excluded_paths (Union[List[str], PathMatcher]): excluded paths,
+                or their PathMatcher built once by the caller
 
         Returns:
                         bool: _description_
@@ -29,19 +79,10 @@ class Auth:
         if excluded_paths is None or excluded_paths == []:
             return True
 
-        if path in excluded_paths:
-            return False
-
-        for excluded_path in excluded_paths:
-            if excluded_path.startswith(path):
-                return False
-            elif path.startswith(excluded_path):
-                return False
-            elif excluded_path[-1] == "*":
-                if path.startswith(excluded_path[:-1]):
-                    return False
+        if not isinstance(excluded_paths, PathMatcher):
+            excluded_paths = compile_excluded_paths(tuple(excluded_paths))
 
-        return True
+        return not excluded_paths.excludes(path)
 
     def authorization_header(self, request=None) -> str:
         """_summary_
@@ -68,6 +109,20 @@ class Auth:
 
         return None
 
+    def user_from_context(self, context: AuthContext) -> TypeVar('User'):
+        """Returns the user of the request of context
+
+        Subclasses look it up from the memoized header or cookie of
+        context; by default it is current_user of the request.
+
+        Args:
+            context (AuthContext): the authentication context
+
+        Returns:
+                        User: the user, None if there is none
+        """
+        return self.current_user(context.request)
+
     def session_cookie(self, request=None):
         """_summary_
 
@@ -4,14 +4,24 @@ Module for Basic Authentication
 """
 
 import base64
-from typing import Tuple, Optional
-from api.v1.auth.auth import Auth
+from typing import Tuple, Optional, TypeVar
+from api.v1.auth.auth import Auth, AuthContext
+from api.v1.auth.credential_cache import CredentialCache
 from models.user import User
 
 class BasicAuth(Auth):
     """BasicAuth class that inherits from Auth.
     """
 
+    def __init__(self):
+        """Initializes the cache of verified credentials (see
+        CredentialCache.from_env), invalidated when a user is saved or
+        removed.
+        """
+        self.credential_cache = CredentialCache.from_env()
+        if self.credential_cache is not None:
+            User.observe(lambda user: self.credential_cache.invalidate(user.id))
+
     def extract_base64_authorization_header(self, authorization_header: str) -> str:
         """Extracts the Base64 part from the Authorization header.
         """
@@ -85,10 +95,34 @@ class BasicAuth(Auth):
         if request is None:
             return None
 
-        auth_header = self.authorization_header(request)
+        return self.user_for_authorization_header(
+            self.authorization_header(request))
+
+    def user_from_context(self, context: AuthContext) -> TypeVar('User'):
+        """Retrieves the User instance from the memoized Authorization
+        header of an AuthContext.
+        """
+        return self.user_for_authorization_header(
+            context.authorization_header)
+
+    def user_for_authorization_header(self, auth_header: str
+                                      ) -> TypeVar('User'):
+        """Retrieves the User instance of a Basic Authorization header.
+        """
         if auth_header is None:
             return None
 
+        cache = self.credential_cache
+        if cache is not None:
+            cached = cache.get(auth_header)
+            if cached is not None:
+                user_id, password = cached
+                user = User.get(user_id)
+                # Another process may have changed the password
+                if user is not None and user.password == password:
+                    return user
+                cache.discard(auth_header)
+
         base64_auth_header = self.extract_base64_authorization_header(auth_header)
         if base64_auth_header is None:
             return None
@@ -102,5 +136,6 @@ class BasicAuth(Auth):
             return None
 
         user = self.user_object_from_credentials(user_email, user_pwd)
+        if user is not None and cache is not None:
+            cache.put(auth_header, user.id, user.password)
         return user
-
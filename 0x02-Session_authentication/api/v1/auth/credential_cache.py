@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+""" Module for the cache of verified Basic credentials
+"""
+from collections import OrderedDict
+from os import getenv
+from typing import Dict, Optional
+import hashlib
+import os
+import threading
+import time
+
+
+class CredentialCache:
+    """ Bounded LRU cache of verified Authorization headers, with a TTL
+
+    An entry maps a keyed hash (keyed BLAKE2b, a MAC cheaper than HMAC,
+    with a random per-process key) of the raw header, so the credentials
+    themselves are not kept, to the user ID and the password hash it was
+    verified against.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        """ Initialize a cache of max_size entries valid ttl seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['CredentialCache']:
+        """ Return the cache configured by BASIC_AUTH_CACHE_SIZE (default:
+        1024, 0 disables it) and BASIC_AUTH_CACHE_TTL (seconds, default:
+        300), None if it is disabled
+        """
+        try:
+            max_size = int(getenv("BASIC_AUTH_CACHE_SIZE", "1024"))
+        except ValueError:
+            max_size = 1024
+        try:
+            ttl = float(getenv("BASIC_AUTH_CACHE_TTL", "300"))
+        except ValueError:
+            ttl = 300.0
+        if max_size <= 0 or ttl <= 0:
+            return None
+        return cls(max_size, ttl)
+
+    def get(self, header: str) -> Optional[tuple]:
+        """ Return the (user ID, password hash) verified for header, None
+        if it is not cached or expired
+        """
+        key = self._hash(header)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, password, expires = entry
+            if expires < time.monotonic():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user_id, password
+
+    def put(self, header: str, user_id: str, password: str):
+        """ Cache that header holds the valid credentials of user_id,
+        whose password hash is password
+        """
+        key = self._hash(header)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (user_id, password,
+                                  time.monotonic() + self.ttl)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, header: str):
+        """ Forget header
+        """
+        with self._lock:
+            self._discard(self._hash(header))
+
+    def invalidate(self, user_id: str):
+        """ Forget every header of user_id
+        """
+        with self._lock:
+            for key in self._by_user.pop(user_id, ()):
+                del self._entries[key]
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        """ Return the counters and the size of the cache
+        """
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "expirations": self.expirations,
+                    "invalidations": self.invalidations}
+
+    def _hash(self, header: str) -> bytes:
+        """ Return the keyed hash of header
+        """
+        return hashlib.blake2b(header.encode(), key=self._key,
+                               digest_size=16).digest()
+
+    def _discard(self, key: bytes):
+        """ Remove the entry of key, if any; the lock is held
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[0])
+        keys.discard(key)
+        if not keys:
+            del self._by_user[entry[0]]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+""" Module for the expiry index of the sessions
+"""
+from datetime import datetime
+from os import getenv
+from typing import Callable, List
+import heapq
+import threading
+
+
+class ExpiryIndex:
+    """ Min-heap of session IDs by expiry time
+
+    sweep pops the expired sessions, at most batch per call so a request
+    sweeping them never waits long; the others are left for the next
+    calls. The sessions of a sweep are evicted by one call, so a store
+    can remove them together. A destroyed session stays in the heap until
+    it expires, then evict finds nothing to remove.
+    """
+
+    def __init__(self, batch: int = None):
+        """ Initialize an empty index sweeping batch sessions per call, by
+        default SESSION_SWEEP_BATCH (100)
+        """
+        if batch is None:
+            try:
+                batch = int(getenv("SESSION_SWEEP_BATCH", "100"))
+            except ValueError:
+                batch = 100
+        self.batch = max(batch, 1)
+        self._heap = []
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """ Return the number of scheduled sessions
+        """
+        return len(self._heap)
+
+    def add(self, session_id: str, expires_at: datetime):
+        """ Schedule session_id to expire at expires_at
+        """
+        with self._lock:
+            heapq.heappush(self._heap, (expires_at, session_id))
+
+    def sweep(self, now: datetime,
+              evict: Callable[[List[str]], int]) -> int:
+        """ Call evict with the sessions expired before now, up to batch
+        of them, and return the number it evicted
+        """
+        heap = self._heap
+        if not heap or heap[0][0] >= now:
+            return 0
+        expired = []
+        with self._lock:
+            while heap and heap[0][0] < now and len(expired) < self.batch:
+                expired.append(heapq.heappop(heap)[1])
+        evicted = evict(expired)
+        self.record_evictions(evicted)
+        return evicted
+
+    def record_evictions(self, evicted: int):
+        """ Count sessions evicted, by a sweep or on lookup
+        """
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Module for matching request paths against the excluded paths
+"""
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+import os
+
+
+DEFAULT_EXCLUDED_PATHS = ['/api/v1/status/', '/api/v1/unauthorized/',
+                          '/api/v1/forbidden/', '/api/v1/auth_session/login/']
+
+# Key of the trie nodes where an excluded path, or the stem of a `*`
+# excluded path, ends
+_END = 0
+
+
+class PathMatcher:
+    """Prefix trie of excluded paths, answering in O(len(path)) whether a
+    path is excluded from authentication
+
+    A path is excluded, as with the historical loop of Auth.require_auth,
+    when it is a prefix of an excluded path, when an excluded path is a
+    prefix of it, or when it starts with the stem of an excluded path
+    ending with `*`.
+    """
+
+    def __init__(self, excluded_paths: Iterable[str]):
+        """Builds the trie of excluded_paths
+
+        Args:
+            excluded_paths (Iterable[str]): excluded paths, a trailing `*`
+                matching any suffix
+        """
+        self._root = None
+        for excluded_path in excluded_paths:
+            if self._root is None:
+                self._root = {}
+            node = self._root
+            for char in excluded_path:
+                node = node.setdefault(char, {})
+            node[_END] = True
+            if excluded_path.endswith("*"):
+                self._node(excluded_path[:-1])[_END] = True
+
+    def excludes(self, path: str) -> bool:
+        """Returns whether path is excluded from authentication
+        """
+        node = self._root
+        if node is None:
+            return False
+        for char in path:
+            if _END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return True
+
+    def _node(self, prefix: str) -> dict:
+        """Returns the node of prefix, which is in the trie
+        """
+        node = self._root
+        for char in prefix:
+            node = node[char]
+        return node
+
+
+@lru_cache(maxsize=32)
+def compile_excluded_paths(excluded_paths: Tuple[str, ...]) -> PathMatcher:
+    """Returns the PathMatcher of excluded_paths, built once per list
+    """
+    return PathMatcher(excluded_paths)
+
+
+def load_excluded_paths() -> List[str]:
+    """Returns the excluded paths from the configuration
+
+    AUTH_EXCLUDED_PATHS_FILE names a file with one path per line (blank
+    lines and lines starting with # are skipped); otherwise
+    AUTH_EXCLUDED_PATHS is a comma-separated list of paths; otherwise
+    DEFAULT_EXCLUDED_PATHS apply.
+    """
+    file_path = os.getenv("AUTH_EXCLUDED_PATHS_FILE")
+    if file_path:
+        with open(file_path) as f:
+            return [line.strip() for line in f
+                    if line.strip() and not line.startswith("#")]
+    excluded_paths = os.getenv("AUTH_EXCLUDED_PATHS")
+    if excluded_paths:
+        return [path.strip() for path in excluded_paths.split(",")
+                if path.strip()]
+    return list(DEFAULT_EXCLUDED_PATHS)
@@ -4,7 +4,7 @@ Module for authentication using Session auth
 """
 
 
-from .auth import Auth
+from .auth import Auth, AuthContext
 
 from models.user import User
 from uuid import uuid4
@@ -51,7 +51,23 @@ class SessionAuth(Auth):
             request (_type_, optional): _description_. Defaults to None.
         """
         session_cookie = self.session_cookie(request)
-        user_id = self.user_id_for_session_id(session_cookie)
+        return self.user_for_session_id(session_cookie)
+
+    def user_from_context(self, context: AuthContext) -> User:
+        """Returns the user of the memoized session cookie of context
+
+        Args:
+            context (AuthContext): the authentication context
+        """
+        return self.user_for_session_id(context.session_cookie)
+
+    def user_for_session_id(self, session_id: str = None) -> User:
+        """Returns the user of a session ID
+
+        Args:
+            session_id (str, optional): the session ID. Defaults to None.
+        """
+        user_id = self.user_id_for_session_id(session_id)
         user = User.get(user_id)
         return user
 
@@ -2,40 +2,68 @@
 """ SessionDBAuth module for session authentication with persistence in the database (file)
 """
 from api.v1.auth.session_exp_auth import SessionExpAuth
+from api.v1.auth.session_store import SessionStore
 from models.user_session import UserSession
 from datetime import datetime
-import models
+from typing import List
+from uuid import uuid4
 
 
 class SessionDBAuth(SessionExpAuth):
     """ SessionDBAuth class for session management with database persistence
+
+    Sessions live in the UserSession records only, looked up by session ID
+    through a SessionStore, so they are shared by every process of the API.
+    Expired records are swept like the sessions of SessionExpAuth: each
+    process schedules the sessions it creates, and the ones stored when
+    it starts.
     """
 
+    def __init__(self):
+        """ Initialize the session duration, the session store and the
+        expiry index
+        """
+        super().__init__()
+        self.session_store = SessionStore()
+        if self.session_duration > 0:
+            for user_session in UserSession.iterate():
+                self._schedule(user_session.session_id,
+                               user_session.created_at)
+
     def create_session(self, user_id=None):
         """ Create and store a new session in the database (file)
         """
-        session_id = super().create_session(user_id)
-        if session_id is None:
+        if user_id is None or not isinstance(user_id, str):
             return None
 
-        # Create a UserSession instance
+        session_id = str(uuid4())
         user_session = UserSession(user_id=user_id, session_id=session_id)
-        user_session.save()  # Save the session in the file (database)
+        self.session_store.add(user_session)
+        self._schedule(session_id, user_session.created_at)
+        self.sweep()
         return session_id
 
     def user_id_for_session_id(self, session_id=None):
-        """ Retrieve the user_id for a given session ID from the database (file)
+        """ Retrieve the user_id for a given session ID from the database
+        (file), None if the session does not exist or has expired
         """
-        if session_id is None:
+        self.sweep()
+        if session_id is None or not isinstance(session_id, str):
             return None
 
-        # Search for the session in the database
-        user_sessions = models.storage.all(UserSession)
-        for session in user_sessions.values():
-            if session.session_id == session_id:
-                return session.user_id
+        user_session = self.session_store.get(session_id)
+        if user_session is None:
+            return None
+
+        if self.session_duration <= 0:
+            return user_session.user_id
+
+        if self._expired(user_session.created_at, self._now()):
+            self.session_store.remove(user_session)
+            self.expiry_index.record_evictions(1)
+            return None
 
-        return None
+        return user_session.user_id
 
     def destroy_session(self, request=None):
         """ Destroy the session by removing it from the database (file)
@@ -47,12 +75,45 @@ class SessionDBAuth(SessionExpAuth):
         if session_id is None:
             return False
 
-        # Search for the session and delete it
-        user_sessions = models.storage.all(UserSession)
-        for session in user_sessions.values():
-            if session.session_id == session_id:
-                session.remove()  # Remove the session from the file (database)
-                return True
+        user_session = self.session_store.get(session_id)
+        if user_session is None:
+            return False
+
+        self.session_store.remove(user_session)
+        return True
 
-        return False
+    def session_stats(self) -> dict:
+        """ Return the number of stored, scheduled and evicted sessions
+        """
+        return {"live": UserSession.count(),
+                "scheduled": len(self.expiry_index),
+                "evicted": self.expiry_index.evictions}
+
+    def _evict(self, session_id: str) -> bool:
+        """ Remove the UserSession of session_id if it has expired, return
+        whether it was
+        """
+        return self._evict_many([session_id]) == 1
 
+    def _evict_many(self, session_ids: List[str]) -> int:
+        """ Remove the expired UserSession records of session_ids, return
+        how many were
+
+        They are removed together, so the file engine rewrites the
+        snapshot once per sweep rather than once per session.
+        """
+        now = self._now()
+        expired = []
+        for session_id in session_ids:
+            user_session = self.session_store.get(session_id)
+            if user_session is not None and \
+                    self._expired(user_session.created_at, now):
+                expired.append(user_session)
+        if not expired:
+            return 0
+        return self.session_store.remove_many(expired)
+
+    def _now(self) -> datetime:
+        """ Return the current time, on the clock of UserSession.created_at
+        """
+        return datetime.utcnow()
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """ Module for Session Expiration Authentication
 """
+from api.v1.auth.expiry_index import ExpiryIndex
 from api.v1.auth.session_auth import SessionAuth
 from os import getenv
 from datetime import datetime, timedelta
+from typing import List
 
 
 class SessionExpAuth(SessionAuth):
     """ Session Expiration Authentication class
+
+    Sessions are scheduled in an ExpiryIndex when created; every creation
+    and lookup sweeps a few expired sessions out of user_id_by_session_id.
     """
 
     def __init__(self):
@@ -18,6 +23,7 @@ class SessionExpAuth(SessionAuth):
             self.session_duration = int(session_duration)
         except Exception:
             self.session_duration = 0
+        self.expiry_index = ExpiryIndex()
 
     def create_session(self, user_id=None):
         """ Create a new session and store the session info with expiration
@@ -29,14 +35,17 @@ class SessionExpAuth(SessionAuth):
         # Store session data including creation time
         session_data = {
             "user_id": user_id,
-            "created_at": datetime.now()
+            "created_at": self._now()
         }
         self.user_id_by_session_id[session_id] = session_data
+        self._schedule(session_id, session_data["created_at"])
+        self.sweep()
         return session_id
 
     def user_id_for_session_id(self, session_id=None):
         """ Retrieve the user ID for a given session ID and check for expiration
         """
+        self.sweep()
         if session_id is None:
             return None
 
@@ -52,9 +61,60 @@ class SessionExpAuth(SessionAuth):
             return session_data.get("user_id")
 
         # Check if the session has expired
-        expiration_time = created_at + timedelta(seconds=self.session_duration)
-        if expiration_time < datetime.now():
+        if self._expired(created_at, self._now()):
+            if self._evict(session_id):
+                self.expiry_index.record_evictions(1)
             return None
 
         return session_data.get("user_id")
 
+    def sweep(self) -> int:
+        """ Evict a batch of expired sessions, return how many were
+        """
+        if self.session_duration <= 0:
+            return 0
+        return self.expiry_index.sweep(self._now(), self._evict_many)
+
+    def session_stats(self) -> dict:
+        """ Return the number of live, scheduled and evicted sessions
+        """
+        return {"live": len(self.user_id_by_session_id),
+                "scheduled": len(self.expiry_index),
+                "evicted": self.expiry_index.evictions}
+
+    def _schedule(self, session_id: str, created_at: datetime):
+        """ Schedule the eviction of a session created at created_at
+        """
+        if self.session_duration > 0:
+            self.expiry_index.add(
+                session_id,
+                created_at + timedelta(seconds=self.session_duration))
+
+    def _evict(self, session_id: str) -> bool:
+        """ Remove session_id if it has expired, return whether it was
+        """
+        session_data = self.user_id_by_session_id.get(session_id)
+        if not isinstance(session_data, dict) or \
+                not self._expired(session_data.get("created_at"),
+                                  self._now()):
+            return False
+        return self.user_id_by_session_id.pop(session_id, None) is not None
+
+    def _evict_many(self, session_ids: List[str]) -> int:
+        """ Remove the expired sessions of session_ids, return how many
+        were
+        """
+        return sum(1 for session_id in session_ids
+                   if self._evict(session_id))
+
+    def _expired(self, created_at: datetime, now: datetime) -> bool:
+        """ Return whether a session created at created_at has expired
+        """
+        if created_at is None or self.session_duration <= 0:
+            return False
+        return created_at + timedelta(seconds=self.session_duration) < now
+
+    def _now(self) -> datetime:
+        """ Return the current time, on the clock of created_at
+        """
+        return datetime.now()
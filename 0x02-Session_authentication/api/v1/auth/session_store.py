@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+""" Module for the store of the UserSession records, by session ID
+"""
+from collections import OrderedDict
+from os import getenv
+from typing import List, Optional
+from models.user_session import UserSession
+import threading
+
+
+class SessionStore:
+    """ UserSession records keyed by session ID, with a bounded LRU
+    read-through cache in front of the storage engine
+
+    A miss is an indexed search on session_id, so a lookup never depends
+    on the number of sessions. A cached session is served while the
+    generation of UserSession (see Base.generation) is the one read before
+    its search: a write by any process, such as a logout, makes it read
+    again on its next lookup. This relies on a generation shared by every
+    connection and process (the sqlite engine keeps it in the database).
+    """
+
+    def __init__(self, max_size: int = None):
+        """ Initialize a store caching max_size sessions, by default
+        SESSION_CACHE_SIZE (10000; 0 disables the cache)
+        """
+        if max_size is None:
+            try:
+                max_size = int(getenv("SESSION_CACHE_SIZE", "10000"))
+            except ValueError:
+                max_size = 10000
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[UserSession]:
+        """ Return the UserSession of session_id, None if there is none
+        """
+        generation = UserSession.generation()
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None and cached[0] == generation:
+                self._cache.move_to_end(session_id)
+                return cached[1]
+        user_sessions = UserSession.search({"session_id": session_id})
+        if not user_sessions:
+            self._forget(session_id)
+            return None
+        self._remember(user_sessions[0], generation)
+        return user_sessions[0]
+
+    def add(self, user_session: UserSession):
+        """ Save user_session
+
+        It is cached by its first lookup, at a generation read before the
+        search: one read after the save could already count a removal by
+        another process, and would then serve the removed session.
+        """
+        self._forget(user_session.session_id)
+        user_session.save()
+
+    def remove(self, user_session: UserSession):
+        """ Remove user_session
+        """
+        self._forget(user_session.session_id)
+        user_session.remove()
+
+    def remove_many(self, user_sessions: List[UserSession]) -> int:
+        """ Remove user_sessions at once, return the number which were
+        stored
+        """
+        for user_session in user_sessions:
+            self._forget(user_session.session_id)
+        return UserSession.remove_many(user_sessions)
+
+    def _remember(self, user_session: UserSession, generation):
+        """ Cache user_session, read at generation
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._cache[user_session.session_id] = (generation, user_session)
+            self._cache.move_to_end(user_session.session_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, session_id: str):
+        """ Drop session_id from the cache
+        """
+        with self._lock:
+            self._cache.pop(session_id, None)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """ Module of Index views
 """
-from flask import jsonify, abort
+from flask import current_app, jsonify, abort
 from api.v1.views import app_views
 
 @app_views.route('/status', methods=['GET'], strict_slashes=False)
@@ -17,10 +17,18 @@ def stats() -> str:
     """ GET /api/v1/stats
     Return:
       - the number of each objects
+      - the counters of the Basic credential cache, when enabled
+      - the live and evicted sessions, with expiring sessions
     """
     from models.user import User
     stats = {}
     stats['users'] = User.count()
+    auth = current_app.extensions.get('auth')
+    cache = getattr(auth, 'credential_cache', None)
+    if cache is not None:
+        stats['basic_auth_cache'] = cache.stats()
+    if hasattr(auth, 'session_stats'):
+        stats['sessions'] = auth.session_stats()
     return jsonify(stats)
 
 @app_views.route('/unauthorized', methods=['GET'], strict_slashes=False)
@@ -2,18 +2,87 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import abort, current_app, jsonify, request
 from models.user import User
+from os import getenv
+from typing import Callable, Iterable, Iterator
+
+
+# With USERS_LIST_CACHE=1, the encoded body of GET /api/v1/users is kept
+# with the generation of the users it was built at, and reused until the
+# users change
+USERS_LIST_CACHE = getenv("USERS_LIST_CACHE", "").lower() in (
+    "1", "true", "yes")
+users_list_cache = (None, None)
+
+# Number of users encoded per chunk of a streamed list
+STREAM_CHUNK_SIZE = 100
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: maximum number of users returned
+      - after: ID the users start after; with limit or after, users are
+        ordered by ID, so the last ID of a page gives the next one
+      - stream: 1 to send the JSON array as it is encoded
     Return:
       - list of all User objects JSON represented
+      - header X-Total-Count: number of users, whatever the page
+      - 400 if limit is not a positive integer
+    """
+    global users_list_cache
+    limit = request.args.get("limit")
+    after = request.args.get("after")
+    stream = request.args.get("stream", "").lower() in ("1", "true", "yes")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return jsonify({'error': "limit must be a positive integer"}), 400
+    headers = {"X-Total-Count": str(User.count())}
+
+    if limit is not None or after is not None:
+        users = User.page(after, limit)
+    elif stream:
+        users = User.iterate()
+    else:
+        if USERS_LIST_CACHE:
+            generation = User.generation()
+            if users_list_cache[0] == generation:
+                return current_app.response_class(
+                    users_list_cache[1], mimetype="application/json",
+                    headers=headers)
+        all_users = [user.to_json() for user in User.all()]
+        response = jsonify(all_users)
+        if USERS_LIST_CACHE:
+            users_list_cache = (generation, response.get_data())
+        response.headers.update(headers)
+        return response
+
+    if stream:
+        return current_app.response_class(
+            stream_json_list(users, current_app.json.dumps),
+            mimetype="application/json", headers=headers)
+    return jsonify([user.to_json() for user in users]), 200, headers
+
+
+def stream_json_list(objs: Iterable, dumps: Callable) -> Iterator[str]:
+    """ Yield the JSON array of objs in chunks of STREAM_CHUNK_SIZE objects
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    yield "["
+    chunk = []
+    separator = ""
+    for obj in objs:
+        chunk.append(separator + dumps(obj.to_json()))
+        separator = ","
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk) + "]\n"
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+""" Benchmark of the authentication of a request by before_request, for
+each AUTH_TYPE: the former hook, which resolved the user twice, versus
+the AuthContext resolving it once
+
+Only the hook is timed, within one request context.
+
+Each AUTH_TYPE runs in its own process, on the memory engine, with the
+given number of users (and sessions). The user lookups are counted by
+wrapping current_user.
+
+Usage: ./bench_before_request.py [users]
+"""
+import base64
+import os
+import subprocess
+import sys
+import time
+
+
+AUTH_TYPES = ('auth', 'basic_auth', 'session_auth', 'session_exp_auth',
+              'session_db_auth')
+EXCLUDED_LIST = ['/api/v1/status/', '/api/v1/unauthorized/',
+                 '/api/v1/forbidden/', '/api/v1/auth_session/login/']
+REQUESTS = 2000
+SESSION_NAME = '_my_session_id'
+
+
+def run_child(users: int):
+    """ Time the authentication of requests to /api/v1/users/me and
+    /api/v1/status, with both hooks, and print one line per hook
+    """
+    from flask import abort, request
+    from werkzeug.exceptions import HTTPException
+    from api.v1.app import app, auth
+    from models.user import User
+
+    def former_before_request():
+        """ before_request as it was before AuthContext
+        """
+        setattr(request, "current_user", auth.current_user(request))
+        if auth.require_auth(request.path, EXCLUDED_LIST):
+            cookie = auth.session_cookie(request)
+            if auth.authorization_header(request) is None and cookie is None:
+                abort(401, description="Unauthorized")
+            if auth.current_user(request) is None:
+                abort(403, description='Forbidden')
+
+    for i in range(users):
+        user = User(email='user{}@example.com'.format(i))
+        user.password = 'pwd{}'.format(i)
+        user.save()
+    headers = {}
+    if hasattr(auth, 'create_session'):
+        for i in range(users):
+            session_id = auth.create_session(user.id)
+        headers['Cookie'] = '{}={}'.format(SESSION_NAME, session_id)
+    else:
+        credentials = '{}:pwd{}'.format(user.email, users - 1)
+        headers['Authorization'] = 'Basic ' + base64.b64encode(
+            credentials.encode()).decode()
+
+    lookups = [0]
+    current_user = auth.current_user
+
+    def counted_current_user(request=None):
+        """ current_user, counted
+        """
+        lookups[0] += 1
+        return current_user(request)
+
+    auth.current_user = counted_current_user
+    hooks = (('former', former_before_request),
+             ('context', app.before_request_funcs[None][0]))
+    for name, hook in hooks:
+        app.before_request_funcs[None] = [hook]
+        results = []
+        for path in ('/api/v1/users/me', '/api/v1/status/'):
+            lookups[0] = 0
+            with app.test_request_context(path, headers=headers):
+                start = time.perf_counter()
+                for _ in range(REQUESTS):
+                    # A new request, as far as the hooks can tell
+                    request.__dict__.pop('auth_context', None)
+                    try:
+                        hook()
+                    except HTTPException:
+                        pass
+                elapsed = time.perf_counter() - start
+            results.append(1e6 * elapsed / REQUESTS)
+            results.append(lookups[0] / REQUESTS)
+        print(name, *results)
+
+
+def main(users: int = 1000):
+    """ Benchmark each AUTH_TYPE
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f'{"AUTH_TYPE":>17} {"hook":>8} {"auth us":>8} {"lookups":>8} '
+          f'{"excluded us":>12} {"lookups":>8}')
+    for auth_type in AUTH_TYPES:
+        env = dict(os.environ, PYTHONPATH=here, DB_ENGINE='memory',
+                   AUTH_TYPE=auth_type, SESSION_NAME=SESSION_NAME,
+                   SESSION_DURATION='3600')
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), '--child',
+             str(users)], env=env).decode()
+        for line in output.splitlines():
+            name, auth_us, lookups, excluded_us, excluded_lookups = \
+                line.split()
+            print(f'{auth_type:>17} {name:>8} {float(auth_us):>8.1f} '
+                  f'{float(lookups):>8.1f} {float(excluded_us):>12.1f} '
+                  f'{float(excluded_lookups):>8.1f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        run_child(int(sys.argv[2]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+""" Benchmark of the memory held by loaded User objects: slots-based
+models versus the same attributes stored in a __dict__, in bytes per user
+
+Usage: ./bench_models_memory.py [users]
+"""
+from datetime import datetime
+import json
+import sys
+import tracemalloc
+import uuid
+
+from models.base import TIMESTAMP_FORMAT
+from models.user import User
+
+
+class DictUser():
+    """ User laid out like the models before __slots__
+    """
+
+    def __init__(self, **kwargs: dict):
+        """ Initialize a DictUser as Base and User do
+        """
+        self.id = kwargs.get('id', str(uuid.uuid4()))
+        self.created_at = datetime.strptime(kwargs.get('created_at'),
+                                            TIMESTAMP_FORMAT)
+        self.updated_at = datetime.strptime(kwargs.get('updated_at'),
+                                            TIMESTAMP_FORMAT)
+        self.email = kwargs.get('email')
+        self._password = kwargs.get('_password')
+        self.first_name = kwargs.get('first_name')
+        self.last_name = kwargs.get('last_name')
+
+
+def records(users: int) -> str:
+    """ Return the JSON of users user records, half of them never updated
+    """
+    start = datetime(2024, 1, 1).timestamp()
+    return json.dumps([{
+        "id": str(uuid.uuid4()),
+        "created_at": datetime.fromtimestamp(start + i).strftime(
+            TIMESTAMP_FORMAT),
+        "updated_at": datetime.fromtimestamp(start + i + i % 2).strftime(
+            TIMESTAMP_FORMAT),
+        "email": "user{}@example.com".format(i),
+        "_password": "{:064x}".format(i),
+        "first_name": "First{}".format(i),
+        "last_name": "Last{}".format(i),
+    } for i in range(users)])
+
+
+def bytes_per_user(cls: type, content: str, users: int) -> float:
+    """ Return the bytes held per object once users objects of cls are
+    loaded from content, by ID as the engines keep them
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = {}
+    for obj_json in json.loads(content):
+        objs[obj_json["id"]] = cls(**obj_json)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size / users
+
+
+def main(users: int = 100000):
+    """ Print the bytes per user of both layouts
+    """
+    content = records(users)
+    print(f'{"layout":>8} {"bytes/user":>11}')
+    for name, cls in (('dict', DictUser), ('slots', User)):
+        print(f'{name:>8} {bytes_per_user(cls, content, users):>11.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
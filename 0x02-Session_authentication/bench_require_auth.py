@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+""" Benchmark of Auth.require_auth with hundreds of excluded paths: the
+historical loop over the list versus the precompiled PathMatcher
+
+Both are first checked to agree on every sampled path.
+
+Usage: ./bench_require_auth.py [patterns ...]
+"""
+import random
+import sys
+import time
+
+from api.v1.auth.path_matcher import DEFAULT_EXCLUDED_PATHS, PathMatcher
+
+
+REQUESTS = 20000
+
+
+def require_auth_loop(path: str, excluded_paths: list) -> bool:
+    """ The loop Auth.require_auth ran before PathMatcher
+    """
+    if path is None:
+        return True
+    if excluded_paths is None or excluded_paths == []:
+        return True
+    if path in excluded_paths:
+        return False
+    for excluded_path in excluded_paths:
+        if excluded_path.startswith(path):
+            return False
+        elif path.startswith(excluded_path):
+            return False
+        elif excluded_path[-1] == "*":
+            if path.startswith(excluded_path[:-1]):
+                return False
+    return True
+
+
+def excluded_patterns(count: int, rng: random.Random) -> list:
+    """ Return count gateway-like excluded paths, a quarter of them with
+    a trailing `*`
+    """
+    patterns = list(DEFAULT_EXCLUDED_PATHS)
+    while len(patterns) < count:
+        path = "/api/v{}/{}/{}".format(rng.randint(1, 3),
+                                       rng.choice(("public", "health",
+                                                   "static", "webhooks")),
+                                       rng.randrange(10 ** 6))
+        patterns.append(path + ("*" if rng.random() < 0.25 else "/"))
+    return patterns
+
+
+def request_paths(patterns: list, rng: random.Random) -> list:
+    """ Return REQUESTS paths: authenticated routes, mostly, and excluded
+    paths, their prefixes and extensions
+    """
+    paths = []
+    for i in range(REQUESTS):
+        pattern = rng.choice(patterns).rstrip("*")
+        kind = i % 10
+        if kind == 0:
+            paths.append(pattern)
+        elif kind == 1:
+            paths.append(pattern[:rng.randrange(len(pattern))])
+        elif kind == 2:
+            paths.append(pattern + "x/y")
+        else:
+            paths.append("/api/v1/users/{}".format(rng.randrange(10 ** 6)))
+    return paths
+
+
+def main(sizes: list):
+    """ Time both implementations for each number of patterns
+    """
+    rng = random.Random(0)
+    print(f'{"patterns":>9} {"loop us":>9} {"matcher us":>11} '
+          f'{"speedup":>8}')
+    for size in sizes:
+        patterns = excluded_patterns(size, rng)
+        paths = request_paths(patterns, rng)
+        matcher = PathMatcher(patterns)
+        for path in paths:
+            assert require_auth_loop(path, patterns) == \
+                (not matcher.excludes(path)), path
+
+        start = time.perf_counter()
+        for path in paths:
+            require_auth_loop(path, patterns)
+        loop = (time.perf_counter() - start) / len(paths)
+        start = time.perf_counter()
+        for path in paths:
+            matcher.excludes(path)
+        compiled = (time.perf_counter() - start) / len(paths)
+        print(f'{size:>9} {1e6 * loop:>9.2f} {1e6 * compiled:>11.2f} '
+              f'{loop / compiled:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [4, 100, 500, 2000])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+""" Benchmark of SessionDBAuth.user_id_for_session_id as the number of
+live sessions grows: the former scan of every UserSession versus the
+SessionStore (indexed search and read-through cache)
+
+Each engine runs in its own process, in a temporary directory. With the
+sqlite engine, a session destroyed by another process must also stop
+being served from the cache of the other threads.
+
+Usage: ./bench_session_lookup.py [sessions ...]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+ENGINES = ('memory', 'file', 'sqlite')
+LOOKUPS = 2000
+SCANS = 20
+
+
+def run_child(sizes: list):
+    """ Time both lookups for each number of sessions, and print one line
+    per size
+    """
+    from api.v1.auth.session_db_auth import SessionDBAuth
+    from models.user_session import UserSession
+
+    def scan(session_id: str) -> str:
+        """ user_id_for_session_id as it was before SessionStore
+        """
+        for user_session in UserSession.all():
+            if user_session.session_id == session_id:
+                return user_session.user_id
+        return None
+
+    auth = SessionDBAuth()
+    session_ids = []
+    for size in sizes:
+        while len(session_ids) < size:
+            session_ids.append(auth.create_session(
+                'user{}'.format(len(session_ids))))
+        session_id = session_ids[len(session_ids) // 2]
+        assert scan(session_id) == auth.user_id_for_session_id(session_id)
+
+        start = time.perf_counter()
+        for _ in range(SCANS):
+            scan(session_id)
+        former = (time.perf_counter() - start) / SCANS
+        start = time.perf_counter()
+        for _ in range(LOOKUPS):
+            auth.user_id_for_session_id(session_id)
+        store = (time.perf_counter() - start) / LOOKUPS
+        print(size, former, store)
+
+    if os.getenv('DB_ENGINE') == 'sqlite':
+        check_remote_logout(auth)
+
+
+def check_remote_logout(auth):
+    """ Assert that a session removed by another process, as by a logout
+    in another worker, is not served any more by any thread
+    """
+    session_id = auth.create_session('remote')
+    user_ids = []
+
+    def lookup():
+        """ Look the session up from a new thread (and connection)
+        """
+        user_ids.append(auth.user_id_for_session_id(session_id))
+
+    for _ in range(2):
+        thread = threading.Thread(target=lookup)
+        thread.start()
+        thread.join()
+    subprocess.check_call([sys.executable, '-c', (
+        'from models.user_session import UserSession\n'
+        'for user_session in UserSession.search({{"session_id": "{}"}}):\n'
+        '    user_session.remove()\n').format(session_id)])
+    lookup()
+    thread = threading.Thread(target=lookup)
+    thread.start()
+    thread.join()
+    assert user_ids == ['remote', 'remote', None, None], user_ids
+
+
+def main(sizes: list):
+    """ Benchmark each engine
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f'{"engine":>7} {"sessions":>9} {"scan us":>10} {"store us":>9}')
+    for engine in ENGINES:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, PYTHONPATH=here, DB_ENGINE=engine,
+                       DB_WRITE_MODE='async', SESSION_DURATION='3600')
+            output = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), '--child'] +
+                [str(size) for size in sizes], cwd=tmp, env=env).decode()
+            for line in output.splitlines():
+                size, former, store = line.split()
+                print(f'{engine:>7} {int(size):>9} '
+                      f'{1e6 * float(former):>10.1f} '
+                      f'{1e6 * float(store):>9.2f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        run_child([int(arg) for arg in sys.argv[2:]])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
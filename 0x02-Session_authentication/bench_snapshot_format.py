@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+""" Benchmark of the snapshot formats of the file engine: file size, save
+time, load time and time to read one object, JSON versus binary
+
+Usage: ./bench_snapshot_format.py [users]
+"""
+from datetime import datetime
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from models.base import TIMESTAMP_FORMAT
+from models.binary import convert, read_binary, read_object, write_binary
+from models.snapshot import read_snapshot, write_snapshot
+
+
+def users_json(users: int) -> dict:
+    """ Return the serialized JSON of users users, by ID
+    """
+    start = datetime(2024, 1, 1).timestamp()
+    objs_json = {}
+    for i in range(users):
+        obj_id = str(uuid.uuid4())
+        objs_json[obj_id] = {
+            "id": obj_id,
+            "created_at": datetime.fromtimestamp(start + i).strftime(
+                TIMESTAMP_FORMAT),
+            "updated_at": datetime.fromtimestamp(start + i + i % 2).strftime(
+                TIMESTAMP_FORMAT),
+            "email": "user{}@example.com".format(i),
+            "_password": "{:064x}".format(i),
+            "first_name": "First{}".format(i),
+            "last_name": None if i % 3 else "Last{}".format(i),
+        }
+    return objs_json
+
+
+def timed(func, *args) -> float:
+    """ Return the best duration of three calls of func(*args), in seconds
+    """
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(users: int = 100000):
+    """ Compare both formats on a snapshot of users users
+    """
+    objs_json = users_json(users)
+    obj_id = list(objs_json)[users // 2]
+    formats = (
+        ('json', '.json', read_snapshot, write_snapshot,
+         lambda path: read_snapshot(path)[obj_id]),
+        ('binary', '.bin', read_binary, write_binary,
+         lambda path: read_object(path, obj_id)),
+    )
+    print(f'{"format":>7} {"size MB":>8} {"save s":>7} {"load s":>7} '
+          f'{"read one ms":>12}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, extension, read, write, read_one in formats:
+            path = os.path.join(tmp, '.db_User' + extension)
+            save = timed(write, path, objs_json)
+            load = timed(read, path)
+            one = timed(read_one, path)
+            assert read(path) == objs_json, "{} round trip".format(name)
+            assert read_one(path) == objs_json[obj_id]
+            print(f'{name:>7} {os.path.getsize(path) / 1e6:>8.1f} '
+                  f'{save:>7.2f} {load:>7.2f} {1000 * one:>12.3f}')
+
+        converted = os.path.join(tmp, 'converted.json')
+        convert(os.path.join(tmp, '.db_User.bin'), converted)
+        assert read_snapshot(converted) == objs_json, "conversion"
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+""" Benchmark of the startup of the file engine: User.load_from_file()
+then a first lookup by email, for eager loading with strptime, eager
+loading with the fast timestamp parser and lazy loading (DB_LAZY_LOAD)
+
+Each run happens in its own process, in a directory holding a snapshot
+of the given number of users.
+
+Usage: ./bench_startup.py [users ...]
+"""
+from datetime import datetime
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+
+MODES = ('strptime', 'eager', 'lazy')
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def write_snapshot(file_path: str, users: int):
+    """ Write a .db_User.json snapshot of users users
+    """
+    start = datetime(2024, 1, 1).timestamp()
+    with open(file_path, 'w') as f:
+        f.write('{')
+        for i in range(users):
+            created = datetime.fromtimestamp(start + i)
+            updated = datetime.fromtimestamp(start + i + i % 2)
+            obj_id = str(uuid.uuid4())
+            record = {
+                "id": obj_id,
+                "created_at": created.strftime(TIMESTAMP_FORMAT),
+                "updated_at": updated.strftime(TIMESTAMP_FORMAT),
+                "email": "user{}@example.com".format(i),
+                "_password": "{:064x}".format(i),
+                "first_name": "First{}".format(i),
+                "last_name": "Last{}".format(i)}
+            f.write('{}{}: {}'.format(', ' if i else '', json.dumps(obj_id),
+                                      json.dumps(record)))
+        f.write('}')
+
+
+def run_child(mode: str, users: int):
+    """ Load the snapshot of the current directory, then look a user up,
+    and print both durations and the peak RSS
+    """
+    import models.base
+    from models.user import User
+
+    if mode == 'strptime':
+        models.base.parse_timestamp = lambda value: datetime.strptime(
+            value, TIMESTAMP_FORMAT)
+    start = time.perf_counter()
+    User.load_from_file()
+    loaded = time.perf_counter()
+    user = User.search({"email": "user{}@example.com".format(users // 2)})[0]
+    user.display_name()
+    looked_up = time.perf_counter()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(loaded - start, looked_up - loaded, peak_kb)
+
+
+def main(sizes: list):
+    """ Benchmark each mode for each number of users
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f'{"users":>9} {"mode":>9} {"load s":>8} {"lookup ms":>10} '
+          f'{"peak RSS MB":>12}')
+    for users in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_snapshot(os.path.join(tmp, '.db_User.json'), users)
+            for mode in MODES:
+                env = dict(os.environ, PYTHONPATH=here, DB_ENGINE='file',
+                           DB_LAZY_LOAD='1' if mode == 'lazy' else '0')
+                output = subprocess.check_output(
+                    [sys.executable, os.path.abspath(__file__), '--child',
+                     mode, str(users)], cwd=tmp, env=env)
+                load, lookup, peak_kb = output.split()
+                print(f'{users:>9} {mode:>9} {float(load):>8.2f} '
+                      f'{1000 * float(lookup):>10.2f} '
+                      f'{int(peak_kb) / 1024:>12.1f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or
+             [10000, 100000, 1000000])
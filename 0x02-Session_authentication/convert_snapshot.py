@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+""" Convert a model snapshot between the JSON and binary formats
+
+Usage: ./convert_snapshot.py SOURCE DESTINATION [--checksum]
+converts .db_<Class>.json to .db_<Class>.bin, or .bin to .json
+"""
+from typing import List
+import argparse
+import sys
+
+from models.binary import convert
+
+
+def main(argv: List[str] = None):
+    """ Convert SOURCE into DESTINATION
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert a model snapshot between .json and .bin")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--checksum", action="store_true",
+                        help="append a checksum to the destination")
+    args = parser.parse_args(argv)
+    convert(args.source, args.destination, args.checksum)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+""" Models of the API, stored by the engine selected with DB_ENGINE
+"""
+from models.engine import get_engine
+
+
+storage = get_engine()
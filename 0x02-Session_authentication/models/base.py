@@ -2,36 +2,65 @@
 """ Base module
 """
 from datetime import datetime
-from typing import TypeVar, List, Iterable
-from os import path
-import json
+from typing import (Callable, Dict, Hashable, TypeVar, List, Iterable,
+                    Iterator, Tuple)
+import models
 import uuid
 
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
-DATA = {}
+# Slot names of each class, base classes first
+FIELDS = {}
+# Callbacks of each class, called with every object saved or removed
+OBSERVERS = {}
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ Parse a timestamp in TIMESTAMP_FORMAT
+
+    datetime.fromisoformat parses this fixed format several times faster
+    than strptime, which is kept for anything else.
+    """
+    if len(value) == 19 and value[10] == 'T':
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+def flush() -> Dict[str, int]:
+    """ Persist the pending writes of every class
+
+    Return the number of writes coalesced for each class name.
+    """
+    return models.storage.flush()
 
 
 class Base():
     """ Base class
     """
 
+    # Attributes are slots rather than a __dict__, to keep instances small
+    # when millions of them are loaded; subclasses declare theirs too.
+    # __json memoizes to_json until an attribute is assigned.
+    __slots__ = ("id", "created_at", "updated_at", "__json")
+
+    # Indexed attributes, mapped to whether their values are unique;
+    # the storage engine uses them to answer search
+    indexes = {}
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
-        s_class = str(self.__class__.__name__)
-        if DATA.get(s_class) is None:
-            DATA[s_class] = {}
-
         self.id = kwargs.get('id', str(uuid.uuid4()))
         if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
+            self.created_at = parse_timestamp(kwargs.get('created_at'))
         else:
             self.created_at = datetime.utcnow()
-        if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+        if kwargs.get('updated_at') is not None and \
+                kwargs.get('updated_at') == kwargs.get('created_at'):
+            # Timestamps are immutable: a never updated object shares one
+            self.updated_at = self.created_at
+        elif kwargs.get('updated_at') is not None:
+            self.updated_at = parse_timestamp(kwargs.get('updated_at'))
         else:
             self.updated_at = datetime.utcnow()
 
@@ -44,69 +73,109 @@ class Base():
             return False
         return (self.id == other.id)
 
+    def __setattr__(self, name: str, value: object):
+        """ Set an attribute and forget the memoized JSON dictionaries
+        """
+        object.__setattr__(self, name, value)
+        if name != "_Base__json":
+            object.__setattr__(self, "_Base__json", None)
+
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
+
+        The dictionary is memoized until an attribute is assigned (or the
+        object saved); a copy is returned.
         """
+        memo = getattr(self, "_Base__json", None)
+        if memo is not None and for_serialization in memo:
+            return dict(memo[for_serialization])
         result = {}
-        for key, value in self.__dict__.items():
+        for key, value in self._items():
             if not for_serialization and key[0] == '_':
                 continue
             if type(value) is datetime:
                 result[key] = value.strftime(TIMESTAMP_FORMAT)
             else:
                 result[key] = value
-        return result
+        if memo is None:
+            memo = {}
+            object.__setattr__(self, "_Base__json", memo)
+        memo[for_serialization] = result
+        return dict(result)
+
+    def _items(self) -> Iterator[Tuple[str, object]]:
+        """ Yield the attributes of the object: its slots, then its
+        __dict__ if a subclass has no __slots__
+        """
+        for key in self.__class__._fields():
+            if hasattr(self, key):
+                yield key, getattr(self, key)
+        yield from getattr(self, '__dict__', {}).items()
 
     @classmethod
-    def load_from_file(cls):
-        """ Load all objects from file
+    def _fields(cls) -> Tuple[str, ...]:
+        """ Return the slot names of the class, base classes first
         """
-        s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
-            return
+        fields = FIELDS.get(cls)
+        if fields is None:
+            fields = tuple(name for klass in reversed(cls.__mro__)
+                           for name in klass.__dict__.get('__slots__', ())
+                           if not name.startswith('__'))
+            FIELDS[cls] = fields
+        return fields
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+    @classmethod
+    def load_from_file(cls):
+        """ Load all objects from the storage engine
+        """
+        models.storage.load(cls)
 
     @classmethod
     def save_to_file(cls):
-        """ Save all objects to file
+        """ Save all objects to the storage engine at once
         """
-        s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
-
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+        models.storage.dump(cls)
 
     def save(self):
         """ Save current object
         """
-        s_class = self.__class__.__name__
         self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        models.storage.save(self)
+        self._notify()
 
     def remove(self):
         """ Remove object
         """
-        s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        models.storage.remove(self)
+        self._notify()
+
+    @classmethod
+    def remove_many(cls, objs: List[TypeVar('Base')]) -> int:
+        """ Remove objects at once, return the number which were stored
+        """
+        removed = models.storage.remove_many(objs)
+        for obj in objs:
+            obj._notify()
+        return removed
+
+    @classmethod
+    def observe(cls, callback: Callable[[TypeVar('Base')], None]):
+        """ Call callback with every object of cls saved or removed by
+        this process, e.g. to invalidate a cache
+        """
+        OBSERVERS.setdefault(cls, []).append(callback)
+
+    def _notify(self):
+        """ Call the callbacks observing the class of the object
+        """
+        for callback in OBSERVERS.get(self.__class__, ()):
+            callback(self)
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
-        s_class = cls.__name__
-        return len(DATA[s_class].keys())
+        return models.storage.count(cls)
 
     @classmethod
     def all(cls) -> Iterable[TypeVar('Base')]:
@@ -114,24 +183,34 @@ class Base():
         """
         return cls.search()
 
+    @classmethod
+    def iterate(cls) -> Iterator[TypeVar('Base')]:
+        """ Iterate over all objects
+        """
+        return models.storage.iterate(cls)
+
+    @classmethod
+    def page(cls, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return objects ordered by ID: the first limit ones (all if
+        limit is None) whose ID is greater than after
+        """
+        return models.storage.page(cls, after, limit)
+
+    @classmethod
+    def generation(cls) -> Hashable:
+        """ Return a value which changes whenever the objects do
+        """
+        return models.storage.generation(cls)
+
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
         """
-        s_class = cls.__name__
-        return DATA[s_class].get(id)
+        return models.storage.get(cls, id)
 
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
         """
-        s_class = cls.__name__
-        def _search(obj):
-            if len(attributes) == 0:
-                return True
-            for k, v in attributes.items():
-                if (getattr(obj, k) != v):
-                    return False
-            return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+        return models.storage.search(cls, attributes)
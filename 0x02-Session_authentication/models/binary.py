@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+""" Binary module: length-prefixed binary snapshots of a model class
+
+Layout of a .db_<Class>.bin file (integers are little-endian):
+
+- header: magic b"MDB1", flags (uint8, 1: checksum), record count
+  (uint32), offset of the ID table (uint64), key count (uint16), then
+  each attribute name as a uint8 length and UTF-8 bytes
+- records: length of the rest of the record (uint32), ID length (uint16)
+  and ID, field count n (uint8), n key numbers (uint8), n type tags
+  (uint8), n payload lengths (uint32, in characters), then the payloads
+  as one UTF-8 string
+- ID table: the record offsets (uint64), sorted by ID
+- with the checksum flag: the SHA-256 of everything before it
+
+The sorted ID table lets read_object read one object without parsing the
+rest of the file.
+"""
+from typing import List, Optional, Tuple
+import hashlib
+import json
+import mmap
+import struct
+
+from models.snapshot import read_snapshot, write_atomic, write_snapshot
+
+
+MAGIC = b"MDB1"
+FLAG_CHECKSUM = 1
+HEADER = struct.Struct("<4sBIQH")
+RECORD = struct.Struct("<IH")
+OFFSET = struct.Struct("<Q")
+CHECKSUM_SIZE = hashlib.sha256().digest_size
+
+# Type tags of the payloads
+NONE, STR, INT, FLOAT, TRUE, FALSE, JSON = range(7)
+
+_lengths = {}
+
+
+def write_binary(file_path: str, objs_json: dict, checksum: bool = False):
+    """ Write objs_json to file_path atomically, in the binary format
+    """
+    keys = {}
+    records = []
+    for obj_id, obj_json in objs_json.items():
+        records.append((obj_id, _encode(obj_id, obj_json, keys)))
+
+    key_bytes = [key.encode() for key in keys]
+    header_size = HEADER.size + sum(1 + len(key) for key in key_bytes)
+    offsets = []
+    position = header_size
+    for obj_id, record in records:
+        offsets.append((obj_id, position))
+        position += len(record)
+    offsets.sort()
+
+    chunks = [HEADER.pack(MAGIC, FLAG_CHECKSUM if checksum else 0,
+                          len(records), position, len(key_bytes))]
+    for key in key_bytes:
+        chunks.append(bytes((len(key),)) + key)
+    chunks.extend(record for _, record in records)
+    chunks.extend(OFFSET.pack(offset) for _, offset in offsets)
+    content = b"".join(chunks)
+    if checksum:
+        content += hashlib.sha256(content).digest()
+    write_atomic(file_path, content)
+
+
+def read_binary(file_path: str) -> dict:
+    """ Read every object of a binary snapshot, by ID
+
+    A ValueError is raised if the file is not a binary snapshot or does
+    not match its checksum.
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    flags, count, table_offset, keys, position = _header(content, file_path)
+    if flags & FLAG_CHECKSUM:
+        if hashlib.sha256(content[:-CHECKSUM_SIZE]).digest() != \
+                content[-CHECKSUM_SIZE:]:
+            raise ValueError("{} is corrupted: checksum mismatch"
+                             .format(file_path))
+    objs_json = {}
+    layouts = {}
+    for _ in range(count):
+        obj_json, position = _decode(content, position, keys, layouts)
+        objs_json[obj_json["id"]] = obj_json
+    return objs_json
+
+
+def read_object(file_path: str, obj_id: str) -> Optional[dict]:
+    """ Read the object with this ID from a binary snapshot, None if
+    there is none, by a binary search of the ID table
+    """
+    with open(file_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        _, count, table_offset, keys, _ = _header(content, file_path)
+        target = obj_id.encode()
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            offset = OFFSET.unpack_from(
+                content, table_offset + middle * OFFSET.size)[0]
+            _, id_length = RECORD.unpack_from(content, offset)
+            start = offset + RECORD.size
+            record_id = content[start:start + id_length]
+            if record_id == target:
+                return _decode(content, offset, keys, {})[0]
+            if record_id < target:
+                low = middle + 1
+            else:
+                high = middle
+    return None
+
+
+def convert(source: str, destination: str, checksum: bool = False):
+    """ Convert a .json snapshot to .bin, or a .bin snapshot to .json
+    """
+    if source.endswith(".bin"):
+        write_snapshot(destination, read_binary(source), checksum)
+    else:
+        write_binary(destination, read_snapshot(source), checksum)
+
+
+def _encode(obj_id: str, obj_json: dict, keys: dict) -> bytes:
+    """ Encode one record, numbering its new attribute names in keys
+    """
+    numbers = []
+    tags = []
+    payloads = []
+    for key, value in obj_json.items():
+        if key == "id":
+            continue
+        if key not in keys:
+            if len(keys) == 255:
+                raise ValueError("too many attribute names")
+            keys[key] = len(keys)
+        numbers.append(keys[key])
+        if value is None:
+            tags.append(NONE)
+            payloads.append("")
+        elif value is True or value is False:
+            tags.append(TRUE if value else FALSE)
+            payloads.append("")
+        elif type(value) is str:
+            tags.append(STR)
+            payloads.append(value)
+        elif type(value) is int:
+            tags.append(INT)
+            payloads.append(str(value))
+        elif type(value) is float:
+            tags.append(FLOAT)
+            payloads.append(repr(value))
+        else:
+            tags.append(JSON)
+            payloads.append(json.dumps(value))
+    encoded_id = obj_id.encode()
+    body = b"".join([encoded_id, bytes((len(numbers),)), bytes(numbers),
+                     bytes(tags),
+                     _length_struct(len(numbers)).pack(
+                         *map(len, payloads)),
+                     "".join(payloads).encode()])
+    return RECORD.pack(len(body) + 2, len(encoded_id)) + body
+
+
+def _decode(content: bytes, position: int, keys: List[str],
+            layouts: dict) -> Tuple[dict, int]:
+    """ Decode the record at position, return it and the next position
+
+    layouts caches the record layouts (see _layout) of the file.
+
+    The payloads are decoded at once, their lengths being in characters;
+    only the fields which are not strings are then converted.
+    """
+    length, id_length = RECORD.unpack_from(content, position)
+    end = position + 4 + length
+    position += RECORD.size
+    obj_id = content[position:position + id_length].decode()
+    position += id_length
+    n = content[position]
+    numbers_tags = content[position + 1:position + 1 + 2 * n]
+    layout = layouts.get(numbers_tags)
+    if layout is None:
+        layout = layouts[numbers_tags] = _layout(numbers_tags, keys)
+    names, converted, lengths = layout
+    position += 1 + 2 * n
+    text = content[position + 4 * n:end].decode()
+    start = 0
+    values = []
+    for size in lengths.unpack_from(content, position):
+        values.append(text[start:start + size])
+        start += size
+    obj_json = dict(zip(names, values))
+    obj_json["id"] = obj_id
+    for name, tag in converted:
+        if tag == NONE:
+            obj_json[name] = None
+        elif tag == INT:
+            obj_json[name] = int(obj_json[name])
+        elif tag == FLOAT:
+            obj_json[name] = float(obj_json[name])
+        elif tag == JSON:
+            obj_json[name] = json.loads(obj_json[name])
+        else:
+            obj_json[name] = tag == TRUE
+    return obj_json, end
+
+
+def _layout(numbers_tags: bytes, keys: List[str]
+            ) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, int], ...],
+                       struct.Struct]:
+    """ Return the attribute names, the (name, tag) pairs of the fields
+    which are not strings and the Struct of the payload lengths of the
+    records with these key numbers and tags
+    """
+    n = len(numbers_tags) // 2
+    names = tuple(keys[number] for number in numbers_tags[:n])
+    converted = tuple((name, tag) for name, tag in
+                      zip(names, numbers_tags[n:]) if tag != STR)
+    return names, converted, _length_struct(n)
+
+
+def _header(content: bytes, file_path: str
+            ) -> Tuple[int, int, int, List[str], int]:
+    """ Parse the header: flags, record count, ID table offset, attribute
+    names and position of the first record
+    """
+    if len(content) < HEADER.size:
+        raise ValueError("{} is not a binary snapshot".format(file_path))
+    magic, flags, count, table_offset, key_count = \
+        HEADER.unpack_from(content, 0)
+    if magic != MAGIC:
+        raise ValueError("{} is not a binary snapshot".format(file_path))
+    position = HEADER.size
+    keys = []
+    for _ in range(key_count):
+        size = content[position]
+        keys.append(content[position + 1:position + 1 + size].decode())
+        position += 1 + size
+    return flags, count, table_offset, keys, position
+
+
+def _length_struct(n: int) -> struct.Struct:
+    """ Return the Struct of n payload lengths
+    """
+    lengths = _lengths.get(n)
+    if lengths is None:
+        lengths = _lengths[n] = struct.Struct("<{}I".format(n))
+    return lengths
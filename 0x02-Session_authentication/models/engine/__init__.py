@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+""" Storage engines of the models
+"""
+from os import getenv
+from models.engine.engine import Engine
+from models.engine.file import FileEngine
+from models.engine.memory import MemoryEngine
+from models.engine.sqlite import SQLiteEngine
+
+
+ENGINES = ("file", "sqlite", "memory")
+
+
+def _flag(name: str) -> bool:
+    """ Return whether the environment variable name is set to true
+    """
+    return getenv(name, "").lower() in ("1", "true", "yes")
+
+
+def get_engine() -> Engine:
+    """ Return a new engine, selected by DB_ENGINE (file by default)
+
+    - file: snapshot files, configured by DB_FORMAT (json or binary),
+      DB_JOURNAL, DB_JOURNAL_COMPACT_THRESHOLD, DB_CHECKSUM,
+      DB_WRITE_MODE, DB_FLUSH_INTERVAL, DB_FLUSH_THRESHOLD, DB_SHARED and
+      DB_LAZY_LOAD
+    - sqlite: SQLite database at DB_SQLITE_PATH (.db.sqlite3 by default)
+    - memory: nothing persisted
+    """
+    engine = getenv("DB_ENGINE", "file")
+    if engine == "file":
+        return FileEngine(_flag("DB_JOURNAL"),
+                          int(getenv("DB_JOURNAL_COMPACT_THRESHOLD", "1000")),
+                          _flag("DB_CHECKSUM"),
+                          getenv("DB_WRITE_MODE", "sync"),
+                          float(getenv("DB_FLUSH_INTERVAL", "1")),
+                          int(getenv("DB_FLUSH_THRESHOLD", "100")),
+                          _flag("DB_SHARED"), _flag("DB_LAZY_LOAD"),
+                          getenv("DB_FORMAT", "json"))
+    if engine == "sqlite":
+        return SQLiteEngine(getenv("DB_SQLITE_PATH", ".db.sqlite3"))
+    if engine == "memory":
+        return MemoryEngine()
+    raise ValueError("DB_ENGINE must be one of {}".format(", ".join(ENGINES)))
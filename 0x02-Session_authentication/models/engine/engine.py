@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+""" Engine module: interface of the storage engines of the models
+"""
+from typing import Dict, Hashable, Iterator, List, TypeVar
+
+
+class Engine():
+    """ Storage of the objects of the models.base.Base subclasses
+
+    Objects are stored by class and ID; the `indexes` attribute of a class
+    declares the attributes to index, and whether their values are unique
+    (save raises a ValueError on a duplicate).
+    """
+
+    def load(self, cls: type):
+        """ (Re)load the objects of cls from durable storage
+        """
+        raise NotImplementedError
+
+    def dump(self, cls: type):
+        """ Write every object of cls to durable storage at once
+        """
+        raise NotImplementedError
+
+    def flush(self) -> Dict[str, int]:
+        """ Persist the pending writes, return their number by class name
+        """
+        return {}
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return the object of cls with this ID, None if there is none
+        """
+        raise NotImplementedError
+
+    def search(self, cls: type,
+               attributes: dict = {}) -> List[TypeVar('Base')]:
+        """ Return the objects of cls with matching attributes
+        """
+        raise NotImplementedError
+
+    def save(self, obj: TypeVar('Base')):
+        """ Insert or update an object
+        """
+        raise NotImplementedError
+
+    def remove(self, obj: TypeVar('Base')):
+        """ Remove an object, if it is stored
+        """
+        raise NotImplementedError
+
+    def remove_many(self, objs: List[TypeVar('Base')]) -> int:
+        """ Remove objects at once, return the number which were stored
+        """
+        return sum(1 for obj in objs if self.remove(obj))
+
+    def count(self, cls: type) -> int:
+        """ Return the number of objects of cls
+        """
+        raise NotImplementedError
+
+    def iterate(self, cls: type) -> Iterator[TypeVar('Base')]:
+        """ Iterate over the objects of cls
+        """
+        raise NotImplementedError
+
+    def page(self, cls: type, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return the objects of cls ordered by ID: the first limit ones
+        (all if limit is None) whose ID is greater than after
+        """
+        raise NotImplementedError
+
+    def generation(self, cls: type) -> Hashable:
+        """ Return a value which changes whenever the objects of cls do
+        """
+        raise NotImplementedError
+
+    def all(self, cls: type) -> Dict[str, TypeVar('Base')]:
+        """ Return the objects of cls by ID
+        """
+        return {obj.id: obj for obj in self.iterate(cls)}
+
+    @staticmethod
+    def matches(obj: TypeVar('Base'), attributes: dict) -> bool:
+        """ Return whether obj has every attribute of attributes
+        """
+        for k, v in attributes.items():
+            if (getattr(obj, k) != v):
+                return False
+        return True
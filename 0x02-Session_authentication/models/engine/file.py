@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+""" File engine module: objects in memory, persisted to .db_<Class>.json
+(or .db_<Class>.bin)
+"""
+from contextlib import nullcontext
+from os import path
+from typing import ContextManager, Dict, Iterator, List, Tuple, TypeVar
+from models.binary import read_binary, write_binary
+from models.engine.lazy import LazyObjects
+from models.engine.memory import MemoryEngine
+from models.journal import Journal
+from models.lock import FileLock
+from models.snapshot import read_snapshot, write_snapshot
+from models.write_behind import WriteBehind
+import os
+
+
+SNAPSHOT_FORMATS = {
+    "json": (".json", read_snapshot, write_snapshot),
+    "binary": (".bin", read_binary, write_binary),
+}
+
+
+class FileEngine(MemoryEngine):
+    """ Engine keeping the objects in memory and persisting each class to
+    a snapshot: .db_<Class>.json, or .db_<Class>.bin in the binary format
+    of models.binary
+
+    - journal: each save/remove appends one record to .db_<Class>.journal,
+      folded into the snapshot every compact_threshold records; otherwise
+      each write rewrites the snapshot
+    - snapshot_format: json or binary
+    - checksum: a SHA-256 footer is appended to the snapshots
+    - write_mode, flush_interval, flush_threshold: see WriteBehind
+    - shared: store shared by several processes (e.g. gunicorn workers):
+      writes hold an exclusive lock on .db_<Class>.lock, and every access
+      first picks up the changes of the other processes, reloading the
+      snapshot when it was replaced and replaying the new journal records
+      otherwise. A shared store is always written synchronously.
+    - lazy: loading only parses the JSON, objects are built on first
+      access (indexed attributes must then be plain JSON values)
+    """
+
+    def __init__(self, journal: bool = False, compact_threshold: int = 1000,
+                 checksum: bool = False, write_mode: str = "sync",
+                 flush_interval: float = 1.0, flush_threshold: int = 100,
+                 shared: bool = False, lazy: bool = False,
+                 snapshot_format: str = "json"):
+        """ Initialize a FileEngine
+        """
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError("snapshot format must be one of {}"
+                             .format(", ".join(SNAPSHOT_FORMATS)))
+        super().__init__()
+        self.extension, self.read_snapshot, self.write_snapshot = \
+            SNAPSHOT_FORMATS[snapshot_format]
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.checksum = checksum
+        self.shared = shared
+        self.lazy = lazy
+        self.writer = WriteBehind(self._persist,
+                                  "sync" if shared else write_mode,
+                                  flush_interval, flush_threshold)
+        self.journals = {}
+        self.locks = {}
+        # Snapshot signature and journal offset each class is up to date
+        # with
+        self.loaded = {}
+
+    def load(self, cls: type):
+        """ Load all objects from file: the snapshot, then the journal
+        """
+        self.writer.flush()
+        s_class = cls.__name__
+        file_path = self._snapshot_path(cls)
+        with self._lock(cls):
+            snapshot = self._signature(cls)[0]
+            objs = LazyObjects(cls, self.read_snapshot(file_path)
+                               if path.exists(file_path) else {})
+            self.objects[s_class] = objs
+
+            journal = self._journal(cls)
+            for record in journal.replay():
+                self._apply(cls, record)
+
+            self._reindex(cls)
+            self.sorted_ids.pop(s_class, None)
+            if not self.lazy:
+                objs.values()
+            self._changed(cls)
+            self.loaded[s_class] = (snapshot, journal.offset)
+
+    def dump(self, cls: type):
+        """ Save all objects to file
+
+        Holds the exclusive lock of a shared store and first picks up the
+        changes of the other processes and the pending writes, so the
+        snapshot is current when it replaces the journal.
+        """
+        with self._lock(cls, True):
+            self._refresh(cls)
+            self.writer.flush()
+            self._dump(cls)
+
+    def _dump(self, cls: type):
+        """ Write the snapshot of the objects in memory, once locked and
+        refreshed
+
+        The snapshot is replaced atomically (see models.snapshot), after
+        which the journal is no longer needed.
+        """
+        objs_json = dict(self._objects(cls).json_items())
+        self.write_snapshot(self._snapshot_path(cls), objs_json,
+                            self.checksum)
+        self._journal(cls).truncate()
+
+    def flush(self) -> Dict[str, int]:
+        """ Persist the pending writes of every class
+
+        Return the number of writes coalesced for each class name.
+        """
+        return self.writer.flush()
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return the object of cls with this ID, None if there is none
+        """
+        self._refresh(cls)
+        return super().get(cls, obj_id)
+
+    def search(self, cls: type,
+               attributes: dict = {}) -> List[TypeVar('Base')]:
+        """ Return the objects of cls with matching attributes
+        """
+        self._refresh(cls)
+        return super().search(cls, attributes)
+
+    def save(self, obj: TypeVar('Base')):
+        """ Insert or update an object, and persist the write
+        """
+        cls = obj.__class__
+        with self._lock(cls, True):
+            self._refresh(cls)
+            super().save(obj)
+            self.writer.write(cls, {"op": "save", "obj": obj.to_json(True)})
+
+    def remove(self, obj: TypeVar('Base')) -> bool:
+        """ Remove an object, and persist the write
+        """
+        cls = obj.__class__
+        with self._lock(cls, True):
+            self._refresh(cls)
+            if not super().remove(obj):
+                return False
+            self.writer.write(cls, {"op": "remove", "id": obj.id})
+            return True
+
+    def remove_many(self, objs: List[TypeVar('Base')]) -> int:
+        """ Remove objects at once, return the number which were stored
+
+        The removals of each class are persisted together: one snapshot
+        rewrite (or one journal append) instead of one per object.
+        """
+        by_class = {}
+        for obj in objs:
+            by_class.setdefault(obj.__class__, []).append(obj)
+        removed = 0
+        for cls, cls_objs in by_class.items():
+            with self._lock(cls, True):
+                self._refresh(cls)
+                records = []
+                for obj in cls_objs:
+                    if super().remove(obj):
+                        records.append({"op": "remove", "id": obj.id})
+                self.writer.write_many(cls, records)
+            removed += len(records)
+        return removed
+
+    def count(self, cls: type) -> int:
+        """ Return the number of objects of cls
+        """
+        self._refresh(cls)
+        return super().count(cls)
+
+    def iterate(self, cls: type) -> Iterator[TypeVar('Base')]:
+        """ Iterate over the objects of cls
+        """
+        self._refresh(cls)
+        return super().iterate(cls)
+
+    def all(self, cls: type) -> Dict[str, TypeVar('Base')]:
+        """ Return the objects of cls by ID
+        """
+        self._refresh(cls)
+        return super().all(cls)
+
+    def page(self, cls: type, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return the objects of cls ordered by ID: the first limit ones
+        (all if limit is None) whose ID is greater than after
+        """
+        self._refresh(cls)
+        return super().page(cls, after, limit)
+
+    def generation(self, cls: type) -> int:
+        """ Return the number of changes made to the objects of cls,
+        including the changes picked up from the other processes
+        """
+        self._refresh(cls)
+        return super().generation(cls)
+
+    def _refresh(self, cls: type):
+        """ Load cls on first use and, in a shared store, pick up the
+        changes made by the other processes: the snapshot is reloaded if
+        it was replaced, the journal records appended since the last
+        access are replayed otherwise
+        """
+        s_class = cls.__name__
+        if not self.shared:
+            if s_class not in self.loaded:
+                self.load(cls)
+            return
+        if self.loaded.get(s_class) == self._signature(cls):
+            return
+        with self._lock(cls):
+            loaded = self.loaded.get(s_class)
+            signature = self._signature(cls)
+            if loaded == signature:
+                return
+            if loaded is None or loaded[0] != signature[0] or \
+                    signature[1] < loaded[1]:
+                self.load(cls)
+                return
+            journal = self._journal(cls)
+            for record in journal.replay(loaded[1]):
+                self._apply(cls, record, True)
+            self.loaded[s_class] = (signature[0], journal.offset)
+
+    def _apply(self, cls: type, record: dict, reindex: bool = False):
+        """ Apply one journal record to the objects (and to the indexes)
+        """
+        objs = self._objects(cls)
+        self.sorted_ids.pop(cls.__name__, None)
+        if record["op"] == "save":
+            obj_json = record["obj"]
+            objs[obj_json["id"]] = obj_json
+            if reindex:
+                for index in self._indexes(cls).values():
+                    index.add(obj_json["id"],
+                              obj_json.get(index.attribute))
+        else:
+            objs.pop(record["id"], None)
+            if reindex:
+                for index in self._indexes(cls).values():
+                    index.discard(record["id"])
+        self._changed(cls)
+
+    def _persist(self, cls: type, records: List[dict]):
+        """ Persist save/remove records
+
+        With the journal, the records are appended and the journal is
+        compacted into the snapshot once it holds enough records;
+        otherwise the whole snapshot is rewritten.
+        """
+        journal = self._journal(cls)
+        if not self.journal:
+            self._dump(cls)
+        else:
+            journal.append_many(records)
+            if journal.records >= self.compact_threshold:
+                self._dump(cls)
+        if self.shared:
+            self.loaded[cls.__name__] = (self._signature(cls)[0],
+                                         journal.offset)
+
+    def _reindex(self, cls: type):
+        """ Rebuild the secondary indexes of cls, without building objects
+        """
+        objs = self._objects(cls)
+        for index in self._indexes(cls).values():
+            index.rebuild(objs.attribute_items(index.attribute))
+
+    def _signature(self, cls: type) -> Tuple[tuple, int]:
+        """ Return the signature of the snapshot and the journal size
+
+        The snapshot is replaced by a rename, so its inode changes on
+        every rewrite.
+        """
+        try:
+            st = os.stat(self._snapshot_path(cls))
+            snapshot = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            snapshot = None
+        return (snapshot, self._journal(cls).size())
+
+    def _snapshot_path(self, cls: type) -> str:
+        """ Return the path of the snapshot of cls
+        """
+        return ".db_{}{}".format(cls.__name__, self.extension)
+
+    def _journal(self, cls: type) -> Journal:
+        """ Return the journal of cls
+        """
+        s_class = cls.__name__
+        if self.journals.get(s_class) is None:
+            self.journals[s_class] = Journal(".db_{}.journal".format(s_class))
+        return self.journals[s_class]
+
+    def _lock(self, cls: type, exclusive: bool = False) -> ContextManager:
+        """ Return the lock of cls in a shared store, a no-op lock otherwise
+        """
+        if not self.shared:
+            return nullcontext()
+        s_class = cls.__name__
+        if self.locks.get(s_class) is None:
+            self.locks[s_class] = FileLock(".db_{}.lock".format(s_class))
+        return self.locks[s_class].hold(exclusive)
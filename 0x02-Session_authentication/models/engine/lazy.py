@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Lazy module: objects by ID, built from their JSON on first access
+"""
+from typing import Any, Iterator, List, Tuple, TypeVar
+
+
+class LazyObjects(dict):
+    """ Objects of a class by ID, each value being either the object or
+    the JSON dictionary it is built from on first access
+
+    Loading a snapshot then only parses the JSON; objects that are never
+    read are never built.
+    """
+
+    def __init__(self, cls: type, objs_json: dict = {}):
+        """ Initialize LazyObjects of cls, with objs_json still unbuilt
+        """
+        super().__init__(objs_json)
+        self.cls = cls
+
+    def __getitem__(self, obj_id: str) -> TypeVar('Base'):
+        """ Return the object with this ID, built if needed
+        """
+        value = super().__getitem__(obj_id)
+        if type(value) is dict:
+            value = self.cls(**value)
+            super().__setitem__(obj_id, value)
+        return value
+
+    def get(self, obj_id: str, default: Any = None) -> TypeVar('Base'):
+        """ Return the object with this ID, default if there is none
+        """
+        if obj_id not in self:
+            return default
+        return self[obj_id]
+
+    def values(self) -> List[TypeVar('Base')]:
+        """ Return every object, all built
+        """
+        return [self[obj_id] for obj_id in list(self)]
+
+    def items(self) -> List[Tuple[str, TypeVar('Base')]]:
+        """ Return every (ID, object) pair, all objects built
+        """
+        return [(obj_id, self[obj_id]) for obj_id in list(self)]
+
+    def json_items(self) -> Iterator[Tuple[str, dict]]:
+        """ Yield (ID, serialized JSON) pairs, without building objects
+        """
+        for obj_id, value in list(super().items()):
+            if type(value) is dict:
+                yield obj_id, value
+            else:
+                yield obj_id, value.to_json(True)
+
+    def attribute_items(self, attribute: str) -> Iterator[Tuple[str, Any]]:
+        """ Yield (ID, value of attribute) pairs, without building objects
+        """
+        for obj_id, value in list(super().items()):
+            if type(value) is dict:
+                yield obj_id, value.get(attribute)
+            else:
+                yield obj_id, getattr(value, attribute, None)
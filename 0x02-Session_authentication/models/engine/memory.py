@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+""" Memory engine module: objects and indexes kept in memory only
+"""
+from typing import Dict, Iterator, List, TypeVar
+from models.engine.engine import Engine
+from models.index import Index
+import bisect
+
+
+class MemoryEngine(Engine):
+    """ Engine keeping the objects in dicts, for tests and benchmarks
+    """
+
+    def __init__(self):
+        """ Initialize a MemoryEngine
+        """
+        self.objects = {}
+        self.indexes = {}
+        self.generations = {}
+        # IDs of each class in order, built by the first page() call then
+        # kept up to date by save/remove
+        self.sorted_ids = {}
+
+    def load(self, cls: type):
+        """ Nothing to load: start with the objects already in memory
+        """
+        self._objects(cls)
+
+    def dump(self, cls: type):
+        """ Nothing to write
+        """
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return the object of cls with this ID, None if there is none
+        """
+        return self._objects(cls).get(obj_id)
+
+    def search(self, cls: type,
+               attributes: dict = {}) -> List[TypeVar('Base')]:
+        """ Return the objects of cls with matching attributes
+
+        When attributes cover indexed attributes, only the objects of the
+        smallest matching index entry are compared.
+        """
+        objs = self._objects(cls)
+        candidates = None
+        for attribute, index in self._indexes(cls).items():
+            if attribute not in attributes:
+                continue
+            try:
+                ids = index.lookup(attributes[attribute])
+            except TypeError:
+                continue
+            if candidates is None or len(ids) < len(candidates):
+                candidates = ids
+
+        if candidates is None:
+            return [obj for obj in objs.values()
+                    if self.matches(obj, attributes)]
+        return [objs[obj_id] for obj_id in candidates
+                if obj_id in objs and self.matches(objs[obj_id], attributes)]
+
+    def save(self, obj: TypeVar('Base')):
+        """ Insert or update an object
+        """
+        cls = obj.__class__
+        indexes = self._indexes(cls).values()
+        for index in indexes:
+            index.check(obj.id, getattr(obj, index.attribute, None))
+        objs = self._objects(cls)
+        ids = self.sorted_ids.get(cls.__name__)
+        if ids is not None and obj.id not in objs:
+            bisect.insort(ids, obj.id)
+        objs[obj.id] = obj
+        for index in indexes:
+            index.add(obj.id, getattr(obj, index.attribute, None))
+        self._changed(cls)
+
+    def remove(self, obj: TypeVar('Base')) -> bool:
+        """ Remove an object, return whether it was stored
+        """
+        cls = obj.__class__
+        if self._objects(cls).pop(obj.id, None) is None:
+            return False
+        ids = self.sorted_ids.get(cls.__name__)
+        if ids is not None:
+            position = bisect.bisect_left(ids, obj.id)
+            if position < len(ids) and ids[position] == obj.id:
+                del ids[position]
+        for index in self._indexes(cls).values():
+            index.discard(obj.id)
+        self._changed(cls)
+        return True
+
+    def count(self, cls: type) -> int:
+        """ Return the number of objects of cls
+        """
+        return len(self._objects(cls))
+
+    def iterate(self, cls: type) -> Iterator[TypeVar('Base')]:
+        """ Iterate over the objects of cls
+        """
+        return iter(list(self._objects(cls).values()))
+
+    def page(self, cls: type, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return the objects of cls ordered by ID: the first limit ones
+        (all if limit is None) whose ID is greater than after
+        """
+        s_class = cls.__name__
+        objs = self._objects(cls)
+        ids = self.sorted_ids.get(s_class)
+        if ids is None:
+            ids = self.sorted_ids[s_class] = sorted(objs)
+        start = 0 if after is None else bisect.bisect_right(ids, after)
+        end = len(ids) if limit is None else start + limit
+        page = []
+        for obj_id in ids[start:end]:
+            obj = objs.get(obj_id)
+            if obj is not None:
+                page.append(obj)
+        return page
+
+    def generation(self, cls: type) -> int:
+        """ Return the number of changes made to the objects of cls
+        """
+        return self.generations.get(cls.__name__, 0)
+
+    def all(self, cls: type) -> Dict[str, TypeVar('Base')]:
+        """ Return the objects of cls by ID
+        """
+        return {obj_id: obj for obj_id, obj in self._objects(cls).items()}
+
+    def _objects(self, cls: type) -> Dict[str, TypeVar('Base')]:
+        """ Return the objects of cls by ID
+        """
+        s_class = cls.__name__
+        if self.objects.get(s_class) is None:
+            self.objects[s_class] = {}
+        return self.objects[s_class]
+
+    def _changed(self, cls: type):
+        """ Count a change of the objects of cls
+        """
+        s_class = cls.__name__
+        self.generations[s_class] = self.generations.get(s_class, 0) + 1
+
+    def _indexes(self, cls: type) -> Dict[str, Index]:
+        """ Return the secondary indexes of cls, by attribute
+        """
+        s_class = cls.__name__
+        if self.indexes.get(s_class) is None:
+            self.indexes[s_class] = {
+                attribute: Index(attribute, unique)
+                for attribute, unique in cls.indexes.items()}
+        return self.indexes[s_class]
+
+    def _reindex(self, cls: type):
+        """ Rebuild the secondary indexes of cls
+        """
+        objs = self._objects(cls)
+        for index in self._indexes(cls).values():
+            index.clear()
+            for obj_id, obj in objs.items():
+                index.add(obj_id, getattr(obj, index.attribute, None))
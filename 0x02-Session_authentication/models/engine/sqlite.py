@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+""" SQLite engine module: objects stored in an SQLite database
+"""
+from typing import Iterator, List, TypeVar
+from models.engine.engine import Engine
+import json
+import sqlite3
+import threading
+
+
+# Types an indexed column can be compared with in SQL
+SQL_TYPES = (str, int, float)
+# Table holding the version of each class table, bumped by every write
+VERSIONS_TABLE = "__versions"
+
+
+class SQLiteEngine(Engine):
+    """ Engine storing each class in a table of an SQLite database
+
+    A row holds the ID, the JSON document of the object and one column
+    per indexed attribute, with a real (unique) SQL index on it. Several
+    threads and processes can share the database; each thread has its
+    own connection.
+
+    Every write also increments the version of its table, in the same
+    transaction, so the generation of a class is the same on every
+    connection of every process.
+    """
+
+    def __init__(self, db_path: str = ".db.sqlite3", timeout: float = 5.0):
+        """ Initialize a SQLiteEngine on the database at db_path
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+
+    def load(self, cls: type):
+        """ Nothing to load: rows are read on demand
+        """
+        self._table(cls)
+
+    def dump(self, cls: type):
+        """ Nothing to write: every save is committed
+        """
+
+    def get(self, cls: type, obj_id: str) -> TypeVar('Base'):
+        """ Return the object of cls with this ID, None if there is none
+        """
+        row = self._connection().execute(
+            'SELECT data FROM "{}" WHERE id = ?'.format(self._table(cls)),
+            (obj_id,)).fetchone()
+        if row is None:
+            return None
+        return cls(**json.loads(row[0]))
+
+    def search(self, cls: type,
+               attributes: dict = {}) -> List[TypeVar('Base')]:
+        """ Return the objects of cls with matching attributes
+
+        Indexed attributes are matched in SQL, the others on the loaded
+        objects.
+        """
+        clauses = []
+        params = []
+        for attribute in cls.indexes:
+            if attribute not in attributes:
+                continue
+            value = attributes[attribute]
+            if value is None:
+                clauses.append('"{}" IS NULL'.format(attribute))
+            elif type(value) in SQL_TYPES:
+                clauses.append('"{}" = ?'.format(attribute))
+                params.append(value)
+        query = 'SELECT data FROM "{}"'.format(self._table(cls))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        objs = (cls(**json.loads(row[0]))
+                for row in self._connection().execute(query, params))
+        return [obj for obj in objs if self.matches(obj, attributes)]
+
+    def save(self, obj: TypeVar('Base')):
+        """ Insert or update an object
+
+        A ValueError is raised when it breaks a unique index.
+        """
+        cls = obj.__class__
+        columns = list(cls.indexes)
+        values = [obj.id, json.dumps(obj.to_json(True))]
+        values += [self._column_value(getattr(obj, attribute, None))
+                   for attribute in columns]
+        names = ", ".join('"{}"'.format(name)
+                          for name in ["id", "data"] + columns)
+        updates = ", ".join('"{0}" = excluded."{0}"'.format(name)
+                            for name in ["data"] + columns)
+        query = 'INSERT INTO "{}" ({}) VALUES ({}) ' \
+                'ON CONFLICT (id) DO UPDATE SET {}'.format(
+                    self._table(cls), names, ", ".join("?" * len(values)),
+                    updates)
+        connection = self._connection()
+        try:
+            with connection:
+                connection.execute(query, values)
+                self._bump(connection, cls)
+        except sqlite3.IntegrityError:
+            for attribute, unique in cls.indexes.items():
+                value = getattr(obj, attribute, None)
+                if unique and value is not None and any(
+                        other.id != obj.id for other in
+                        self.search(cls, {attribute: value})):
+                    raise ValueError("{} {} already exists"
+                                     .format(attribute, value))
+            raise
+
+    def remove(self, obj: TypeVar('Base')) -> bool:
+        """ Remove an object, return whether it was stored
+        """
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                'DELETE FROM "{}" WHERE id = ?'.format(
+                    self._table(obj.__class__)), (obj.id,))
+            if cursor.rowcount > 0:
+                self._bump(connection, obj.__class__)
+        return cursor.rowcount > 0
+
+    def remove_many(self, objs: List[TypeVar('Base')]) -> int:
+        """ Remove objects in one transaction, return the number which
+        were stored
+        """
+        connection = self._connection()
+        removed = set()
+        with connection:
+            for obj in objs:
+                cursor = connection.execute(
+                    'DELETE FROM "{}" WHERE id = ?'.format(
+                        self._table(obj.__class__)), (obj.id,))
+                if cursor.rowcount > 0:
+                    removed.add((obj.__class__, obj.id))
+            for cls in {cls for cls, _ in removed}:
+                self._bump(connection, cls)
+        return len(removed)
+
+    def count(self, cls: type) -> int:
+        """ Return the number of objects of cls
+        """
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM "{}"'.format(self._table(cls))).fetchone()[0]
+
+    def iterate(self, cls: type) -> Iterator[TypeVar('Base')]:
+        """ Iterate over the objects of cls, reading the rows as it goes
+        """
+        cursor = self._connection().execute(
+            'SELECT data FROM "{}"'.format(self._table(cls)))
+        for row in cursor:
+            yield cls(**json.loads(row[0]))
+
+    def page(self, cls: type, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return the objects of cls ordered by ID: the first limit ones
+        (all if limit is None) whose ID is greater than after
+        """
+        query = 'SELECT data FROM "{}"'.format(self._table(cls))
+        params = []
+        if after is not None:
+            query += " WHERE id > ?"
+            params.append(after)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [cls(**json.loads(row[0]))
+                for row in self._connection().execute(query, params)]
+
+    def generation(self, cls: type) -> int:
+        """ Return the version of the table of cls, incremented by every
+        write of any connection
+        """
+        row = self._connection().execute(
+            'SELECT version FROM "{}" WHERE name = ?'.format(VERSIONS_TABLE),
+            (self._table(cls),)).fetchone()
+        return row[0] if row is not None else 0
+
+    @staticmethod
+    def _bump(connection: sqlite3.Connection, cls: type):
+        """ Increment the version of the table of cls, within the
+        transaction of the write
+        """
+        connection.execute(
+            'UPDATE "{}" SET version = version + 1 WHERE name = ?'.format(
+                VERSIONS_TABLE), (cls.__name__,))
+
+    def _connection(self) -> sqlite3.Connection:
+        """ Return the connection of the current thread
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _table(self, cls: type) -> str:
+        """ Create the table of cls and its indexes if needed, return its
+        name
+        """
+        s_class = cls.__name__
+        if s_class in self._tables:
+            return s_class
+        with self._tables_lock:
+            connection = self._connection()
+            columns = "".join(', "{}"'.format(attribute)
+                              for attribute in cls.indexes)
+            with connection:
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS "{}" (name TEXT PRIMARY KEY, '
+                    'version INTEGER NOT NULL)'.format(VERSIONS_TABLE))
+                connection.execute(
+                    'INSERT OR IGNORE INTO "{}" (name, version) '
+                    'VALUES (?, 0)'.format(VERSIONS_TABLE), (s_class,))
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY, '
+                    'data TEXT NOT NULL{})'.format(s_class, columns))
+                for attribute, unique in cls.indexes.items():
+                    connection.execute(
+                        'CREATE {}INDEX IF NOT EXISTS "{}_{}" '
+                        'ON "{}" ("{}")'.format("UNIQUE " if unique else "",
+                                                s_class, attribute, s_class,
+                                                attribute))
+            self._tables.add(s_class)
+        return s_class
+
+    @staticmethod
+    def _column_value(value):
+        """ Return the value stored in an indexed column
+        """
+        if value is None or type(value) in SQL_TYPES:
+            return value
+        return json.dumps(value)
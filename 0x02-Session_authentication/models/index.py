@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+""" Index module: secondary indexes on model attributes
+"""
+from typing import Hashable, Iterable, Set, Tuple
+
+
+class Index():
+    """ Secondary index of one attribute: value -> IDs of the objects
+    """
+
+    def __init__(self, attribute: str, unique: bool = False):
+        """ Initialize an Index of attribute
+
+        A unique index refuses two objects with the same non-None value.
+        """
+        self.attribute = attribute
+        self.unique = unique
+        self._ids = {}
+        self._values = {}
+
+    def add(self, obj_id: str, value: Hashable):
+        """ Index (or re-index) an object under value
+        """
+        self.discard(obj_id)
+        self._ids.setdefault(value, set()).add(obj_id)
+        self._values[obj_id] = value
+
+    def discard(self, obj_id: str):
+        """ Remove an object from the index
+        """
+        if obj_id not in self._values:
+            return
+        value = self._values.pop(obj_id)
+        ids = self._ids[value]
+        ids.discard(obj_id)
+        if len(ids) == 0:
+            del self._ids[value]
+
+    def lookup(self, value: Hashable) -> Set[str]:
+        """ Return the IDs of the objects indexed under value
+        """
+        return self._ids.get(value, set())
+
+    def check(self, obj_id: str, value: Hashable):
+        """ Raise a ValueError if indexing obj_id under value would break
+        the uniqueness of the index
+        """
+        if not self.unique or value is None:
+            return
+        for other_id in self._ids.get(value, ()):
+            if other_id != obj_id:
+                raise ValueError("{} {} already exists"
+                                 .format(self.attribute, value))
+
+    def rebuild(self, items: Iterable[Tuple[str, Hashable]]):
+        """ Replace the content of the index with (ID, value) pairs, whose
+        IDs are distinct
+        """
+        self._ids = ids = {}
+        self._values = values = {}
+        for obj_id, value in items:
+            values[obj_id] = value
+            same = ids.get(value)
+            if same is None:
+                ids[value] = {obj_id}
+            else:
+                same.add(obj_id)
+
+    def clear(self):
+        """ Remove every object from the index
+        """
+        self._ids = {}
+        self._values = {}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+""" Journal module: append-only log of the writes of a model class
+"""
+from os import path
+from typing import Iterable, Iterator
+import json
+import os
+
+
+class Journal():
+    """ Append-only file of JSON records, one per line
+    """
+
+    def __init__(self, file_path: str):
+        """ Initialize a Journal stored in file_path
+        """
+        self.file_path = file_path
+        self.records = 0
+        self.offset = 0
+        self._file = None
+
+    def append(self, record: dict):
+        """ Append one record and make it durable
+        """
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[dict]):
+        """ Append records with a single write and fsync
+        """
+        lines = [json.dumps(record) + "\n" for record in records]
+        if self._file is None:
+            self._file = self._open()
+        self._file.write("".join(lines).encode())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records += len(lines)
+        self.offset = self._file.tell()
+
+    def replay(self, offset: int = 0) -> Iterator[dict]:
+        """ Yield every complete record of the journal from offset, in order
+
+        A torn last line, left by a crash during an append, is ignored.
+        Afterwards, offset is the end of the last complete record.
+        """
+        if offset == 0:
+            self.records = 0
+        self.offset = offset
+        if not path.exists(self.file_path):
+            return
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    return
+                self.records += 1
+                self.offset += len(line)
+                yield record
+
+    def size(self) -> int:
+        """ Return the size of the journal file, 0 if there is none
+        """
+        try:
+            return os.stat(self.file_path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def truncate(self):
+        """ Empty the journal, once its records are in a snapshot
+        """
+        self.close()
+        if path.exists(self.file_path):
+            with open(self.file_path, 'wb') as f:
+                os.fsync(f.fileno())
+        self.records = 0
+        self.offset = 0
+
+    def close(self):
+        """ Close the journal file
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        """ Open the journal for appending, cutting a torn last line
+        """
+        f = open(self.file_path, 'a+b')
+        f.seek(0)
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            f.truncate(content.rfind(b"\n") + 1)
+        return f
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+""" Lock module: lock files shared by the processes using the models
+"""
+from contextlib import contextmanager
+from typing import Iterator
+import fcntl
+import os
+import threading
+
+
+class FileLock():
+    """ Shared (readers) or exclusive (writers) lock on a lock file
+
+    The lock is reentrant for the thread holding it, which keeps the mode
+    it first took. It is also a thread lock, so one thread at a time of
+    each process holds it.
+    """
+
+    def __init__(self, file_path: str):
+        """ Initialize a FileLock on file_path
+        """
+        self.file_path = file_path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    @contextmanager
+    def hold(self, exclusive: bool = False) -> Iterator[None]:
+        """ Hold the lock for the duration of a with block
+        """
+        with self._thread_lock:
+            if self._depth == 0:
+                # A new descriptor each time: a descriptor inherited
+                # through fork would share its lock with the parent
+                fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX if exclusive
+                                else fcntl.LOCK_SH)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self._fd = fd
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    os.close(self._fd)
+                    self._fd = None
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+""" Snapshot module: atomic writes of the JSON snapshot of a model class
+"""
+from os import path
+import hashlib
+import json
+import os
+import tempfile
+
+
+CHECKSUM_FOOTER = b"\n# sha256 "
+
+
+def _read_umask() -> int:
+    """ Return the umask of the process (setting it is the only portable
+    way to read it, so this runs once, at import)
+    """
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _read_umask()
+
+
+def write_snapshot(file_path: str, objs_json: dict, checksum: bool = False):
+    """ Write objs_json to file_path atomically
+
+    The content goes to a temporary file of the same directory, is
+    fsynced, then renamed over file_path, and the directory is fsynced:
+    a reader sees either the previous snapshot or the new one, never a
+    truncated file, even after a crash. With checksum, a footer line
+    holding the SHA-256 of the JSON document is appended.
+    """
+    content = json.dumps(objs_json).encode()
+    if checksum:
+        content += CHECKSUM_FOOTER + \
+            hashlib.sha256(content).hexdigest().encode() + b"\n"
+    write_atomic(file_path, content)
+
+
+def write_atomic(file_path: str, content: bytes):
+    """ Replace file_path with content atomically and durably
+
+    The new file keeps the mode of the file it replaces, or gets the
+    default mode of the umask (not the 0600 of mkstemp).
+    """
+    directory = path.dirname(path.abspath(file_path))
+    try:
+        mode = os.stat(file_path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp_path = tempfile.mkstemp(prefix=path.basename(file_path) + ".",
+                                    suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def read_snapshot(file_path: str) -> dict:
+    """ Read a snapshot written by write_snapshot
+
+    A checksum footer, when present, is verified: a ValueError is raised
+    if the content does not match it.
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    footer = content.rfind(CHECKSUM_FOOTER)
+    if footer != -1:
+        expected = content[footer + len(CHECKSUM_FOOTER):].strip()
+        content = content[:footer]
+        if hashlib.sha256(content).hexdigest().encode() != expected:
+            raise ValueError("{} is corrupted: checksum mismatch"
+                             .format(file_path))
+    return json.loads(content)
+
+
+def _fsync_directory(directory: str):
+    """ Make a rename in directory durable, where the OS allows it
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
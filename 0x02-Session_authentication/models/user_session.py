@@ -9,6 +9,10 @@ class UserSession(Base):
     """ UserSession class to manage session data in a file
     """
 
+    __slots__ = ("user_id", "session_id")
+
+    indexes = {"session_id": True, "user_id": False}
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a new UserSession instance
         """
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+""" Write-behind module: coalesce the writes of the models into flushes
+"""
+from typing import Callable, Dict, List
+import atexit
+import logging
+import threading
+
+
+WRITE_MODES = ("sync", "group", "async")
+# Number of failed flushes remembered for the writers waiting on them
+FAILURES_KEPT = 16
+
+
+class WriteBehind():
+    """ Pending writes of each model class, flushed together
+
+    Modes:
+      - sync: every write is flushed on its own before save returns
+      - group: writes are flushed before save returns, but all the writes
+        made while a flush is running share the next flush (group commit)
+      - async: save returns at once; pending writes are flushed every
+        interval seconds, as soon as threshold writes are pending, by
+        flush() and at process exit
+
+    Flushes never overlap, so snapshots are written one at a time.
+
+    When flush_class raises, the records it did not persist go back to the
+    pending writes, to be retried by the next flush, and the exception
+    reaches the writers whose records were in that flush.
+    """
+
+    def __init__(self, flush_class: Callable[[type, List[dict]], None],
+                 mode: str = "sync", interval: float = 1.0,
+                 threshold: int = 100):
+        """ Initialize a WriteBehind
+
+        flush_class(cls, records) persists the pending records of cls.
+        """
+        if mode not in WRITE_MODES:
+            raise ValueError("write mode must be one of {}"
+                             .format(", ".join(WRITE_MODES)))
+        self.flush_class = flush_class
+        self.mode = mode
+        self.interval = interval
+        self.threshold = threshold
+        self.flushes = 0
+        self.writes = 0
+        self.last_flush = {}
+        self._pending = {}
+        self._pending_count = 0
+        self._started = 0
+        self._completed = 0
+        self._flushing = False
+        self._failures = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        if mode == "async":
+            threading.Thread(target=self._run, daemon=True,
+                             name="write-behind").start()
+            atexit.register(self.close)
+
+    def write(self, cls: type, record: dict):
+        """ Register one write of cls
+        """
+        self.write_many(cls, [record])
+
+    def write_many(self, cls: type, records: List[dict]):
+        """ Register writes of cls, persisted by the same flush
+        """
+        if not records:
+            return
+        if self.mode == "sync":
+            self._acquire()
+            with self._cond:
+                self._started += 1
+                number = self._started
+            self._flush({cls: list(records)}, number)
+            return
+
+        with self._cond:
+            self._pending.setdefault(cls, []).extend(records)
+            self._pending_count += len(records)
+            flush_number = self._started + 1
+            if self.mode == "async":
+                if self._pending_count < self.threshold or self._flushing:
+                    return
+            else:
+                while self._completed < flush_number and self._flushing:
+                    self._cond.wait()
+                if self._completed >= flush_number:
+                    if flush_number in self._failures:
+                        raise self._failures[flush_number]
+                    return
+            self._flushing = True
+        self._flush_pending()
+
+    def flush(self) -> Dict[str, int]:
+        """ Persist every pending write
+
+        Returns the number of writes coalesced for each class name.
+        """
+        self._acquire()
+        return self._flush_pending()
+
+    def close(self):
+        """ Stop the flush timer and flush the pending writes
+        """
+        self._stop.set()
+        self.flush()
+
+    def _acquire(self):
+        """ Wait for the running flush, if any, and start a new one
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flushing = True
+
+    def _flush_pending(self) -> Dict[str, int]:
+        """ Persist the pending writes, once the flush is acquired
+
+        The flush is numbered in the critical section taking the pending
+        writes: a writer numbers its flush as the next one to start, so
+        any record appended after the swap must find it started.
+        """
+        with self._cond:
+            pending = self._pending
+            self._pending = {}
+            self._pending_count = 0
+            self._started += 1
+            number = self._started
+        return self._flush(pending, number, True)
+
+    def _flush(self, pending: Dict[type, List[dict]], number: int,
+               requeue: bool = False) -> Dict[str, int]:
+        """ Persist writes as flush number, once the flush is acquired,
+        then release it
+
+        With requeue, the records of a failed flush_class (and of the
+        classes after it) are put back in front of the pending writes.
+        """
+        flushed = []
+        try:
+            for cls, records in pending.items():
+                self.flush_class(cls, records)
+                flushed.append(cls)
+        except BaseException as e:
+            with self._cond:
+                if requeue:
+                    failed = {cls: list(records)
+                              for cls, records in pending.items()
+                              if cls not in flushed}
+                    for cls, records in self._pending.items():
+                        failed.setdefault(cls, []).extend(records)
+                    self._pending = failed
+                    self._pending_count = sum(map(len, failed.values()))
+                self._failures[number] = e
+                while len(self._failures) > FAILURES_KEPT:
+                    del self._failures[min(self._failures)]
+            raise
+        finally:
+            coalesced = {cls.__name__: len(pending[cls]) for cls in flushed}
+            with self._cond:
+                self._completed += 1
+                self._flushing = False
+                if coalesced:
+                    self.flushes += 1
+                    self.writes += sum(coalesced.values())
+                    self.last_flush = coalesced
+                self._cond.notify_all()
+        return coalesced
+
+    def _run(self):
+        """ Flush timer
+
+        A failed flush is logged; its records are retried by the next one.
+        """
+        while not self._stop.wait(self.interval):
+            if self._pending_count:
+                try:
+                    self.flush()
+                except Exception:
+                    logging.getLogger(__name__).exception(
+                        "write-behind flush failed")
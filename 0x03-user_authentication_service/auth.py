@@ -3,8 +3,8 @@
 """
 
 
-import bcrypt
 from db import DB
+from hash_service import get_hash_service
 from user import User
 from sqlalchemy.orm.exc import NoResultFound
 from uuid import uuid4
@@ -21,7 +21,7 @@ def _hash_password(password: str) -> str:
     Returns:
         bytes: _description_
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return get_hash_service().hash(password)
 
 
 def _generate_uuid() -> str:
@@ -75,8 +75,13 @@ class Auth:
             user = self._db.find_user_by(email=email)
         except NoResultFound:
             return False
-        # check validity of password
-        return bcrypt.checkpw(password.encode('utf-8'), user.hashed_password)
+        # check validity of password in the bcrypt worker pool, upgrading
+        # hashes computed with a stale cost factor
+        valid, new_hash = get_hash_service().verify_and_rehash(
+            user.hashed_password, password)
+        if new_hash is not None:
+            self._db.update_user(user.id, hashed_password=new_hash)
+        return valid
 
     def create_session(self, email: str) -> str:
         """_summary_
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Bcrypt hashing service running hashes and checks in a bounded worker pool
+"""
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from os import cpu_count, environ
+from typing import Callable, Dict, Optional, Tuple
+import asyncio
+import math
+import os
+import tempfile
+import threading
+import time
+import bcrypt
+
+
+DEFAULT_ROUNDS = 12
+# File sharing the calibrated cost factor between the processes
+DEFAULT_ROUNDS_FILE = ".bcrypt_rounds"
+# Bounds of the delay between two polls for a slot by the async forms
+ASYNC_POLL_MIN = 0.001
+ASYNC_POLL_MAX = 0.05
+
+_policy = None
+_policy_lock = threading.Lock()
+_service = None
+_service_lock = threading.Lock()
+
+
+def _hashpw(password: bytes, rounds: int = DEFAULT_ROUNDS) -> bytes:
+    """
+    Hashes a password with a new salt of the given cost, in a worker
+    """
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _checkpw(password: bytes, hashed_password: bytes) -> bool:
+    """
+    Checks a password against its hash, in a worker
+    """
+    return bcrypt.checkpw(password, hashed_password)
+
+
+def hash_rounds(hashed_password: bytes) -> int:
+    """
+    Returns the cost factor a bcrypt hash was computed with
+    """
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode()
+    return int(hashed_password.split(b'$')[2])
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = 10,
+                     max_rounds: int = 16) -> int:
+    """
+    Picks the cost factor whose verification takes about target_ms on
+    this machine
+
+    The best of three verifications at min_rounds is measured, each extra
+    round doubling it, and the highest cost staying under target_ms is
+    kept.
+
+    Args:
+        target_ms: target verification latency in milliseconds
+        min_rounds: lowest acceptable cost factor
+        max_rounds: highest acceptable cost factor
+
+    Returns:
+        The chosen cost factor, between min_rounds and max_rounds
+    """
+    hashed = bcrypt.hashpw(b'calibration', bcrypt.gensalt(min_rounds))
+    elapsed_ms = math.inf
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.checkpw(b'calibration', hashed)
+        elapsed_ms = min(elapsed_ms, 1000 * (time.perf_counter() - start))
+    if elapsed_ms >= target_ms:
+        return min_rounds
+    extra = int(math.log2(target_ms / elapsed_ms))
+    return max(min_rounds, min(max_rounds, min_rounds + extra))
+
+
+def shared_rounds(path: str, target_ms: float, min_rounds: int = 10,
+                  max_rounds: int = 16) -> int:
+    """
+    Returns the cost factor stored at path, calibrating and storing it
+    first if there is none
+
+    The first process to store a cost wins: it is linked into place only
+    if path does not exist yet, and every other process reads it, so all
+    the workers hash with the same cost instead of each its own.
+
+    Args:
+        path: file holding the cost factor
+        target_ms, min_rounds, max_rounds: see calibrate_rounds
+
+    Returns:
+        The shared cost factor
+    """
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        pass
+    rounds = calibrate_rounds(target_ms, min_rounds, max_rounds)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bcrypt_rounds")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(str(rounds))
+        os.link(tmp_path, path)
+    except FileExistsError:
+        with open(path) as f:
+            return int(f.read())
+    finally:
+        os.unlink(tmp_path)
+    return rounds
+
+
+class HashPolicy:
+    """
+    Cost factor new hashes are computed with
+
+    The cost is either fixed or calibrated on this machine to hit a
+    target verification latency; a calibrated cost is shared through
+    rounds_file when given. Hashes whose cost differs by more than
+    tolerance are stale and get recomputed on the next successful login.
+    """
+
+    def __init__(self, rounds: int = None, target_ms: float = None,
+                 min_rounds: int = 10, max_rounds: int = 16,
+                 rounds_file: str = None, tolerance: int = 0):
+        """
+        Constructor method for HashPolicy class
+
+        Args:
+            rounds: fixed cost factor, takes precedence over target_ms
+            target_ms: target verification latency to calibrate for
+            min_rounds: lowest cost factor calibration may pick
+            max_rounds: highest cost factor calibration may pick
+            rounds_file: file sharing the calibrated cost (see
+                shared_rounds), None to calibrate in this process only
+            tolerance: difference of cost factor still considered current
+        """
+        if rounds is not None:
+            self.rounds = rounds
+        elif target_ms is not None and rounds_file:
+            self.rounds = shared_rounds(rounds_file, target_ms, min_rounds,
+                                        max_rounds)
+        elif target_ms is not None:
+            self.rounds = calibrate_rounds(target_ms, min_rounds, max_rounds)
+        else:
+            self.rounds = DEFAULT_ROUNDS
+        self.target_ms = target_ms
+        self.tolerance = tolerance
+
+    def needs_rehash(self, hashed_password: bytes) -> bool:
+        """
+        Returns whether a hash was computed with a cost factor more than
+        tolerance away from the policy's
+        """
+        return abs(hash_rounds(hashed_password) - self.rounds) > \
+            self.tolerance
+
+
+class HashService:
+    """
+    Runs bcrypt in a bounded thread or process pool
+
+    Every operation exists in a blocking form, a form returning a
+    concurrent.futures.Future and an asyncio awaitable form. At most
+    max_pending operations are queued or running at once; further
+    submissions wait for a slot.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None,
+                 executor: str = "thread", policy: HashPolicy = None):
+        """
+        Constructor method for HashService class
+
+        Args:
+            workers: number of workers, defaults to the CPU count
+            max_pending: maximum number of queued or running operations,
+                defaults to 16 per worker
+            executor: "thread" (bcrypt releases the GIL) or "process"
+            policy: cost factor policy, defaults to HashPolicy()
+        """
+        self.policy = policy or HashPolicy()
+        self.workers = workers or cpu_count() or 1
+        self.max_pending = max_pending or 16 * self.workers
+        if executor == "process":
+            self._executor = ProcessPoolExecutor(self.workers)
+        elif executor == "thread":
+            self._executor = ThreadPoolExecutor(self.workers,
+                                                thread_name_prefix="bcrypt")
+        else:
+            raise ValueError("executor must be thread or process")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def hash_future(self, password: str) -> Future:
+        """
+        Schedules the hashing of a password, returns a Future of the
+        salted hash
+        """
+        encoded = password.encode()
+        self._slots.acquire()
+        return self._start(_hashpw, encoded, self.policy.rounds)
+
+    def verify_future(self, hashed_password: bytes, password: str) -> Future:
+        """
+        Schedules the check of a password against its hash, returns a
+        Future of the result
+        """
+        encoded = password.encode()
+        self._slots.acquire()
+        return self._start(_checkpw, encoded, hashed_password)
+
+    def hash(self, password: str) -> bytes:
+        """
+        Returns the salted hash of a password
+        """
+        return self.hash_future(password).result()
+
+    def verify(self, hashed_password: bytes, password: str) -> bool:
+        """
+        Returns whether a password matches its hash
+        """
+        return self.verify_future(hashed_password, password).result()
+
+    def verify_and_rehash(self, hashed_password: bytes, password: str
+                          ) -> Tuple[bool, Optional[bytes]]:
+        """
+        Checks a password and recomputes its hash if its cost is stale
+
+        Returns:
+            Whether the password matches, and the new hash to store when
+            it matches a hash of a stale cost, None otherwise
+        """
+        if not self.verify(hashed_password, password):
+            return False, None
+        if not self.policy.needs_rehash(hashed_password):
+            return True, None
+        return True, self.hash(password)
+
+    async def hash_async(self, password: str) -> bytes:
+        """
+        Awaitable returning the salted hash of a password
+        """
+        encoded = password.encode()
+        await self._acquire_async()
+        return await asyncio.wrap_future(
+            self._start(_hashpw, encoded, self.policy.rounds))
+
+    async def verify_async(self, hashed_password: bytes,
+                           password: str) -> bool:
+        """
+        Awaitable returning whether a password matches its hash
+        """
+        encoded = password.encode()
+        await self._acquire_async()
+        return await asyncio.wrap_future(
+            self._start(_checkpw, encoded, hashed_password))
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Returns the queue depth and latency metrics of the service
+        """
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "completed": completed,
+                "avg_latency_ms": (1000 * self.total_latency / completed
+                                   if completed else 0.0),
+                "max_latency_ms": 1000 * self.max_latency,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the workers once pending operations are done
+        """
+        self._executor.shutdown(wait=wait)
+
+    async def _acquire_async(self):
+        """
+        Takes a pending slot without blocking the event loop
+
+        The slot is polled with a non-blocking acquire between growing
+        sleeps (up to ASYNC_POLL_MAX seconds) rather than waited for in an
+        executor thread, which would still take it once the awaiting task
+        is cancelled, and never give it back.
+        """
+        delay = ASYNC_POLL_MIN
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, ASYNC_POLL_MAX)
+
+    def _start(self, func: Callable, *args) -> Future:
+        """
+        Submits func to the pool once a pending slot has been taken
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._finish(start)
+            raise
+        future.add_done_callback(lambda _: self._finish(start))
+        return future
+
+    def _finish(self, start: float):
+        """
+        Records the latency of an operation and frees its slot
+        """
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+        self._slots.release()
+
+
+def get_hash_policy() -> HashPolicy:
+    """
+    Returns the shared HashPolicy, created on first use, without starting
+    the workers of the HashService
+
+    The cost factor is BCRYPT_ROUNDS, or calibrated for a BCRYPT_TARGET_MS
+    verification latency between BCRYPT_MIN_ROUNDS and BCRYPT_MAX_ROUNDS,
+    once for all the processes sharing BCRYPT_ROUNDS_FILE (.bcrypt_rounds;
+    empty to calibrate in each process). Hashes within
+    BCRYPT_ROUNDS_TOLERANCE (0) of it are not rehashed.
+    """
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            rounds = environ.get("BCRYPT_ROUNDS")
+            target_ms = environ.get("BCRYPT_TARGET_MS")
+            _policy = HashPolicy(
+                int(rounds) if rounds else None,
+                float(target_ms) if target_ms else None,
+                int(environ.get("BCRYPT_MIN_ROUNDS", 10)),
+                int(environ.get("BCRYPT_MAX_ROUNDS", 16)),
+                environ.get("BCRYPT_ROUNDS_FILE", DEFAULT_ROUNDS_FILE),
+                int(environ.get("BCRYPT_ROUNDS_TOLERANCE", 0)))
+    return _policy
+
+
+def get_hash_service() -> HashService:
+    """
+    Returns the shared HashService, created on first use
+
+    It is configured with the BCRYPT_WORKERS, BCRYPT_MAX_PENDING and
+    BCRYPT_EXECUTOR (thread or process) environment variables, and the
+    policy of get_hash_policy.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = HashService(
+                int(environ.get("BCRYPT_WORKERS", 0)) or None,
+                int(environ.get("BCRYPT_MAX_PENDING", 0)) or None,
+                environ.get("BCRYPT_EXECUTOR", "thread"), get_hash_policy())
+    return _service